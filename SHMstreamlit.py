@@ -1,8 +1,16 @@
+import os
+import tempfile
+import time
+
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from mpl_toolkits.mplot3d import Axes3D
+
+from shmlib.cache import DiskCache, cache_key
+from shmlib.client import client_animation_html
+from shmlib.kinematics import loop_length
+from shmlib.render import loop_frames, render_video, render_video_parallel
+
+page_start = time.perf_counter()
 
 # ---------------------------
 # PARAMETERS FOR THE ANIMATION
@@ -11,134 +19,142 @@ R = 1.0                # Radius of the circular motion
 omega = 2 * np.pi / 5  # Angular velocity (period = 5 sec)
 t_max = 10             # Maximum time [sec]
 fps = 30               # Frames per second
-n_frames = int(t_max * fps)
 
-# Create the full time array
-t_full = np.linspace(0, t_max, n_frames)
-
-# Precompute circular motion quantities
-x_full = R * np.cos(omega * t_full)
-y_full = R * np.sin(omega * t_full)
-z_full = np.zeros_like(t_full)
-
-# Compute the SHM projection along x:
-d_full = x_full.copy()                # displacement (x-projection)
-v_full = -R * omega * np.sin(omega * t_full)  # velocity
-a_full = -R * omega**2 * np.cos(omega * t_full) # acceleration
-F_full = a_full.copy()  # force (for a unit mass)
+# Figure settings; together with the physical parameters above they form the
+# key of the render cache.
+figsize = (12, 10)     # Figure size [inches]
+dpi = 100              # Figure resolution [dots per inch]
+video_format = "mp4"   # Container of the served video, see VIDEO_FORMATS
+seamless_loop = False  # Encode one seamless loop with scrolling panels instead of 0..t_max
+RENDER_CACHE_SIZE = 8  # Maximum number of rendered videos kept in memory
+
+# On-disk render cache, shared by every server process pointed at the same
+# directory (e.g. a volume mounted into all replicas).
+RENDER_CACHE_DIR = os.environ.get(
+    "SHM_RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "shm-render-cache"))
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("SHM_RENDER_CACHE_MAX_BYTES", 512 * 2**20))
+
+# Number of processes rasterising frames; 1 renders serially in this process.
+# Workers are forked from the multi-threaded Streamlit server, which can
+# deadlock a worker on a lock held by another thread, so they are opt-in.
+RENDER_WORKERS = int(os.environ.get("SHM_RENDER_WORKERS", 1))
+
+# Video container -> (ffmpeg codec, MIME type).
+VIDEO_FORMATS = {
+    "mp4": ("h264", "video/mp4"),
+    "webm": ("libvpx-vp9", "video/webm"),
+}
 
 # ---------------------------
-# SETTING UP THE FIGURE AND AXES
+# RENDERING
 # ---------------------------
-fig = plt.figure(figsize=(12, 10))
-fig.suptitle("Circular Motion, SHM Projections, and Real-Time Force", fontsize=16)
-
-grid = plt.GridSpec(4, 4, figure=fig, wspace=0.5, hspace=0.6)
-
-# 3D animation panel (left two columns)
-ax3d = fig.add_subplot(grid[:, :2], projection='3d')
-ax3d.set_title("3D Circular Motion")
-lim = R * 1.2
-ax3d.set_xlim([-lim, lim])
-ax3d.set_ylim([-lim, lim])
-ax3d.set_zlim([-lim, lim])
-ax3d.set_xlabel("X")
-ax3d.set_ylabel("Y")
-ax3d.set_zlabel("Z")
-ax3d.view_init(elev=20, azim=45)
-
-# Time-series plots on the right
-ax_f = fig.add_subplot(grid[0, 2:])
-ax_f.set_title("Force vs Time")
-ax_f.set_xlim(0, t_max)
-force_lim = R * omega**2 * 1.2
-ax_f.set_ylim(-force_lim, force_lim)
-ax_f.set_ylabel("F (N)")
-
-ax_d = fig.add_subplot(grid[1, 2:])
-ax_d.set_title("Displacement vs Time")
-ax_d.set_xlim(0, t_max)
-ax_d.set_ylim(-lim, lim)
-ax_d.set_ylabel("d (m)")
-
-ax_v = fig.add_subplot(grid[2, 2:])
-ax_v.set_title("Velocity vs Time")
-ax_v.set_xlim(0, t_max)
-vel_lim = abs(R * omega) * 1.2
-ax_v.set_ylim(-vel_lim, vel_lim)
-ax_v.set_ylabel("v (m/s)")
-
-ax_a = fig.add_subplot(grid[3, 2:])
-ax_a.set_title("Acceleration vs Time")
-ax_a.set_xlim(0, t_max)
-ax_a.set_ylim(-force_lim, force_lim)
-ax_a.set_ylabel("a (m/s²)")
-ax_a.set_xlabel("Time (s)")
+def render_animation_video(R, omega, t_max, fps, figsize, dpi, video_format, loop):
+    """Render the animation and return the encoded video file as bytes.
+
+    With ``loop`` only the fewest frames that repeat seamlessly are encoded,
+    with the time-series panels scrolling over the last ``t_max`` seconds,
+    and the player loops them; otherwise, or when the motion does not repeat
+    after a whole number of frames, the frames cover ``0..t_max``.
+    """
+    codec, _ = VIDEO_FORMATS[video_format]
+    suffix = "." + video_format
+    loop = loop and loop_length(omega, fps) is not None
+    window = t_max if loop else None
+    frames = loop_frames(omega, fps, window) if loop else None
+    if RENDER_WORKERS <= 1:
+        return render_video(R, omega, t_max, fps, figsize, dpi, codec, suffix,
+                            window=window, frames=frames)
+
+    video, worker_stats = render_video_parallel(R, omega, t_max, fps, figsize, dpi,
+                                                codec, suffix, workers=RENDER_WORKERS,
+                                                window=window, frames=frames)
+    render_cache_stats()["last_render_workers"] = worker_stats
+    return video
 
 # ---------------------------
-# INITIAL PLOTS
+# CACHED RENDERING
 # ---------------------------
-ax3d.plot(x_full, y_full, z_full, "gray", lw=0.5, alpha=0.5)
-
-point_3d, = ax3d.plot([], [], [], "ro", markersize=8, label="Particle")
-line_center_to_point, = ax3d.plot([], [], [], "r:", lw=2, label="Radius")
-proj_line, = ax3d.plot([], [], [], "g--", lw=1, label="Projection (SHM)")
-force_quiver = None  # placeholder for the force arrow
-
-line_f, = ax_f.plot([], [], "orange", lw=2, label="F(t)")
-line_d, = ax_d.plot([], [], "r-", lw=2, label="d(t)")
-line_v, = ax_v.plot([], [], "m-", lw=2, label="v(t)")
-line_a, = ax_a.plot([], [], "c-", lw=2, label="a(t)")
-
-# ---------------------------
-# ANIMATION FUNCTION
-# ---------------------------
-def update(frame):
-    global force_quiver
-    t = t_full[frame]
-    x = x_full[frame]
-    y = y_full[frame]
-    z = z_full[frame]
-    
-    # SHM quantities at time t
-    d = d_full[frame]
-    v = v_full[frame]
-    a = a_full[frame]
-    
-    point_3d.set_data([x], [y])
-    point_3d.set_3d_properties([z])
-    
-    line_center_to_point.set_data([0, x], [0, y])
-    line_center_to_point.set_3d_properties([0, z])
-    
-    proj_line.set_data([x, x], [0, 0])
-    proj_line.set_3d_properties([0, z])
-    
-    # Update force vector: remove previous quiver if exists.
-    if force_quiver is not None:
-        force_quiver.remove()
-    
-    fx = -R * omega**2 * np.cos(omega * t)
-    fy = -R * omega**2 * np.sin(omega * t)
-    fz = 0
-    force_quiver = ax3d.quiver(x, y, z, fx, fy, fz, color='orange', arrow_length_ratio=0.2)
-    
-    current_slice = slice(0, frame + 1)
-    line_f.set_data(t_full[current_slice], F_full[current_slice])
-    line_d.set_data(t_full[current_slice], d_full[current_slice])
-    line_v.set_data(t_full[current_slice], v_full[current_slice])
-    line_a.set_data(t_full[current_slice], a_full[current_slice])
-    
-    return (point_3d, line_center_to_point, proj_line, line_f, line_d, line_v, line_a)
-
-ani = FuncAnimation(fig, update, frames=n_frames, interval=1000/fps, blit=False)
-
-# Instead of using plt.show(), convert the animation to HTML5 video.
-html_video = ani.to_html5_video()
+@st.cache_resource
+def render_cache_stats():
+    """Hit/miss counters of the in-memory render cache, shared by all sessions."""
+    return {"hits": 0, "misses": 0, "last_render_workers": []}
+
+
+@st.cache_resource
+def render_disk_cache():
+    """The on-disk render cache used by this server process."""
+    return DiskCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES)
+
+
+@st.cache_data(max_entries=RENDER_CACHE_SIZE, show_spinner="Rendering animation...")
+def load_animation_video(R, omega, t_max, fps, figsize, dpi, video_format, loop):
+    """Return the encoded animation as bytes, rendering it only if needed.
+
+    Streamlit reruns this script on every page view and widget interaction,
+    so the encoded video is cached by its parameters: in memory for this
+    process (evicting the least recently used entries beyond
+    ``RENDER_CACHE_SIZE``) and on disk for every process sharing
+    ``RENDER_CACHE_DIR``. Only the first request for a given
+    ``(R, omega, t_max, fps, figsize, dpi, video_format, loop)`` pays for the
+    ffmpeg encode.
+    """
+    render_cache_stats()["misses"] += 1
+
+    disk_cache = render_disk_cache()
+    key = cache_key(R=R, omega=omega, t_max=t_max, fps=fps,
+                    figsize=figsize, dpi=dpi, format=video_format, loop=loop)
+    video = disk_cache.get(key)
+    if video is None:
+        video = render_animation_video(R, omega, t_max, fps, figsize, dpi, video_format, loop)
+        disk_cache.put(key, video)
+    return video
 
 # ---
-# STREAMLIT CODE TO EMBED THE VIDEO
+# STREAMLIT CODE TO EMBED THE ANIMATION
 # ---
 st.title("Circular Motion and SHM Animation")
 st.markdown("This animation shows circular motion and its corresponding SHM projections.")
-st.markdown(html_video, unsafe_allow_html=True)
\ No newline at end of file
+
+render_mode = st.sidebar.radio(
+    "Rendering",
+    ("Server video", "In the browser"),
+    help="'In the browser' sends only the parameters and animates them client-side, "
+         "so parameter changes need no server render.",
+)
+
+if render_mode == "In the browser":
+    width, height = figsize[0] * dpi, figsize[1] * dpi
+    page = client_animation_html(R, omega, t_max, fps, width=width, height=height)
+    st.iframe(page, height=height + 40)
+    st.caption(f"Payload: {len(page.encode()) / 2**10:.1f} KiB of HTML and parameters; "
+               f"page ready {(time.perf_counter() - page_start) * 1000:.0f} ms after it started")
+    st.stop()
+
+cache_stats = render_cache_stats()
+misses_before = cache_stats["misses"]
+video = load_animation_video(R, omega, t_max, fps, figsize, dpi, video_format, seamless_loop)
+if cache_stats["misses"] == misses_before:
+    cache_stats["hits"] += 1
+
+# st.video serves the raw bytes from Streamlit's media endpoint, which answers
+# HTTP range requests, so the browser can seek and stream instead of waiting
+# for a base64 blob pushed over the websocket.
+_, mime_type = VIDEO_FORMATS[video_format]
+st.video(video, format=mime_type, loop=True, autoplay=True, muted=True)
+first_frame_ms = (time.perf_counter() - page_start) * 1000
+
+disk_cache = render_disk_cache()
+st.caption(
+    f"Payload: {len(video) / 2**20:.2f} MiB {video_format.upper()} "
+    f"(inline base64 would be {4 * -(-len(video) // 3) / 2**20:.2f} MiB); "
+    f"video ready to play {first_frame_ms:.0f} ms after the page started"
+)
+st.caption(
+    f"Render cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses in memory; "
+    f"{disk_cache.hits} hits, {disk_cache.misses} misses on disk "
+    f"({disk_cache.total_bytes() / 2**20:.1f} of {disk_cache.max_bytes / 2**20:.0f} MiB)"
+)
+if cache_stats["last_render_workers"]:
+    with st.expander("Last render: per-worker throughput"):
+        st.table([{"worker": w["pid"], "frames": w["frames"], "seconds": round(w["seconds"], 2),
+                   "frames/s": round(w["fps"], 1)} for w in cache_stats["last_render_workers"]])
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Benchmark of the time-series decimation.
+
+Builds a :class:`~shmlib.decimate.MinMaxPyramid` over a long series and
+times decimating prefixes of it to a panel's pixel width, against
+:func:`~shmlib.decimate.minmax_decimate` scanning the same prefix every
+time. Each query is also checked to keep the extremes of its prefix; a
+failed check makes the script exit with status 1.
+
+Run from the repository root::
+
+    python benchmarks/bench_decimate.py [--samples N] [--width PX] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shmlib.decimate import MinMaxPyramid, minmax_decimate  # noqa: E402
+from shmlib.kinematics import circular_motion  # noqa: E402
+
+
+def best_time(func, repeat):
+    """Return the best of ``repeat`` timings of ``func()`` in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=10**6)
+    parser.add_argument("--width", type=int, default=450,
+                        help="pixel columns of a time-series panel")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # The displacement of the default animation, sampled much more finely.
+    t = np.linspace(0, 600, args.samples)
+    y = circular_motion(1.0, 2 * np.pi / 5, t).d
+
+    started = time.perf_counter()
+    pyramid = MinMaxPyramid(y)
+    build = time.perf_counter() - started
+    index_bytes = sum(lo.nbytes + hi.nbytes for lo, hi in pyramid.levels[1:])
+    print(f"{args.samples:.0e} samples: pyramid built in {build * 1000:.1f} ms, "
+          f"{index_bytes / 2**20:.1f} MiB of indices")
+
+    print(f"{'prefix':>9} {'scan [ms]':>10} {'pyramid [ms]':>13} {'points':>7}")
+    ok = True
+    for stop in (args.samples // 100, args.samples // 10, args.samples // 2, args.samples):
+        scan = best_time(lambda: minmax_decimate(t[:stop], y[:stop], args.width), args.repeat)
+        query = best_time(lambda: pyramid.prefix(stop, args.width), args.repeat)
+        index = pyramid.prefix(stop, args.width)
+        ok &= bool(y[index].max() == y[:stop].max() and y[index].min() == y[:stop].min()
+                   and index[0] == 0 and index[-1] == stop - 1)
+        print(f"{stop:9d} {scan * 1000:10.3f} {query * 1000:13.3f} {len(index):7d}")
+
+    if not ok:
+        print("FAIL: a decimated prefix lost its first, last or extreme sample")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Accuracy per CPU-second of the symplectic and adaptive integrators.
+
+Integrates a batch of large-amplitude pendulums and Duffing oscillators
+over a long run with each stepper of :mod:`shmlib.integrators` at several
+step sizes, and reports the CPU time, the largest position error against a
+fine-step reference and the largest relative energy error. The adaptive
+Dormand-Prince integrator is then run at several tolerances, reporting its
+steps, force evaluations and error estimates next to the cheapest fixed-step
+run that was at least as accurate. When scipy is installed,
+``scipy.integrate.solve_ivp`` (RK45 and DOP853) is timed on the same batch
+for comparison. The script exits with status 1 if a stepper misses its
+order of accuracy, if the adaptive integrator is not more accurate at a
+tighter tolerance, if the energy error of a symplectic run grows over the
+run instead of staying bounded, or if the linear limit (``Duffing`` with
+``beta = 0``) strays from ``R cos(omega t)`` with either kind of stepping.
+
+Run from the repository root::
+
+    python benchmarks/bench_integrators.py [--oscillators N] [--t-max SECONDS]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shmlib.integrators import (FORCE_EVALUATIONS, Duffing, Pendulum, integrate,  # noqa: E402
+                                integrate_adaptive)
+
+try:
+    from scipy.integrate import solve_ivp
+except ImportError:
+    solve_ivp = None
+
+SUBSTEPS = (1, 2, 4, 8)
+REFERENCE_SUBSTEPS = 64
+TOLERANCES = (1e-4, 1e-6, 1e-8, 1e-10)
+
+
+def energy_error(model, x, v):
+    """Return the largest relative energy error over the oscillators at each frame."""
+    energy = model.energy(x, v)
+    return np.abs(energy / energy[:, :1] - 1).max(axis=0)
+
+
+def timed(func):
+    started = time.process_time()
+    result = func()
+    return result, time.process_time() - started
+
+
+def run_solve_ivp(model, x0, fps, n_frames, method, rtol):
+    n = len(x0)
+
+    def rhs(t, y):
+        return np.concatenate((y[n:], model.acceleration(y[:n])))
+
+    t_eval = np.arange(n_frames) / fps
+    solution = solve_ivp(rhs, (0, t_eval[-1]), np.concatenate((x0, np.zeros(n))),
+                         method=method, t_eval=t_eval, rtol=rtol, atol=rtol * 1e-3)
+    return solution.y[:n], solution.y[n:], solution.nfev
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--oscillators", type=int, default=64)
+    parser.add_argument("--t-max", type=float, default=500.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    args = parser.parse_args()
+
+    n_frames = int(args.t_max * args.fps)
+    n = args.oscillators
+    failures = []
+    cases = [("pendulum", Pendulum(1.0), np.linspace(0.1, 3.0, n)),
+             ("duffing", Duffing(1.0, beta=1.0), np.linspace(0.1, 2.0, n))]
+
+    for name, model, x0 in cases:
+        reference = integrate(model, x0, 0.0, args.fps, n_frames, "yoshida4",
+                              REFERENCE_SUBSTEPS)
+        print(f"{name}: {n} oscillators x {n_frames} frames over {args.t_max:g} s")
+        print(f"  {'method':<10} {'steps':>5} {'RHS evals':>10} {'CPU [s]':>8} "
+              f"{'max |dx|':>9} {'max |dE/E|':>10} {'early/late dE':>14}")
+        out = tuple(np.empty((n, n_frames)) for _ in range(3))
+        fixed = []  # (error, RHS evaluations, CPU seconds, label) of each run
+        for method in ("verlet", "leapfrog", "yoshida4"):
+            errors = []
+            for substeps in SUBSTEPS:
+                (x, v, _), seconds = timed(lambda: integrate(model, x0, 0.0, args.fps,
+                                                             n_frames, method, substeps, out))
+                error = np.abs(x - reference[0]).max()
+                drift = energy_error(model, x, v)
+                tenth = max(n_frames // 10, 1)
+                early, late = drift[:tenth].max(), drift[-tenth:].max()
+                evals = FORCE_EVALUATIONS[method] * substeps * (n_frames - 1)
+                errors.append(error)
+                fixed.append((error, evals, seconds, f"{method} x{substeps}"))
+                print(f"  {method:<10} {substeps:5d} {evals:10d} {seconds:8.3f} "
+                      f"{error:9.1e} {drift.max():10.1e} {early:7.1e}/{late:.1e}")
+                # Bounded, not secular: the energy error late in the run
+                # stays on the scale of the error early in it.
+                if late > 4 * early + 1e-13:
+                    failures.append(f"{name} {method} x{substeps}: energy error grew "
+                                    f"from {early:.1e} to {late:.1e}")
+            # Halving the step divides the error by 2**order; the phase
+            # error dominates at long times, so ask for most of that. Below
+            # about 1e-8 the reference's own error and rounding take over.
+            order = 4 if method == "yoshida4" else 2
+            ratio = errors[0] / errors[1]
+            if errors[1] > 1e-8 and ratio < 0.6 * 2**order:
+                failures.append(f"{name} {method}: error ratio {ratio:.1f} for half "
+                                f"the step, expected about {2**order}")
+
+        print(f"  {'dopri5':<10} {'rtol':>5} {'RHS evals':>10} {'CPU [s]':>8} "
+              f"{'max |dx|':>9} {'max |dE/E|':>10} {'steps/rejected':>15} "
+              f"{'est. max/total':>15}  fixed step at least as accurate")
+        adaptive_errors = []
+        for rtol in TOLERANCES:
+            (x, v, _, stats), seconds = timed(lambda: integrate_adaptive(
+                model, x0, 0.0, args.fps, n_frames, rtol, rtol, out))
+            error = np.abs(x - reference[0]).max()
+            adaptive_errors.append(error)
+            matches = [run for run in fixed if run[0] <= error]
+            if matches:
+                _, evals, cpu, label = min(matches, key=lambda run: run[2])
+                versus = (f"{label}: {evals} evals, {cpu:.3f} s "
+                          f"({cpu / seconds:.1f}x the CPU)")
+            else:
+                versus = "none measured"
+            print(f"  {'':<10} {rtol:5.0e} {stats.rhs_evaluations:10d} {seconds:8.3f} "
+                  f"{error:9.1e} {energy_error(model, x, v).max():10.1e} "
+                  f"{stats.steps:>8d}/{stats.rejected:<6d} "
+                  f"{stats.max_error:7.1e}/{stats.total_error:.1e}  {versus}")
+        if not all(tight < loose for loose, tight in zip(adaptive_errors, adaptive_errors[1:])):
+            failures.append(f"{name} dopri5: errors {adaptive_errors} do not fall with rtol")
+
+        if solve_ivp is None:
+            print("  scipy is not installed; skipping solve_ivp")
+            continue
+        for method in ("RK45", "DOP853"):
+            for rtol in (1e-6, 1e-9):
+                (x, v, nfev), seconds = timed(lambda: run_solve_ivp(model, x0, args.fps,
+                                                                    n_frames, method, rtol))
+                error = np.abs(x - reference[0]).max()
+                drift = energy_error(model, x, v)
+                tenth = max(n_frames // 10, 1)
+                print(f"  {method:<10} {'rtol':>5} {nfev:10d} {seconds:8.3f} "
+                      f"{error:9.1e} {drift.max():10.1e} "
+                      f"{drift[:tenth].max():7.1e}/{drift[-tenth:].max():.1e}  (rtol {rtol:g})")
+
+    # Linear limit: the Duffing oscillator with beta = 0 has a closed form.
+    R, omega = 1.0, 2 * np.pi / 5
+    x, _, _ = integrate(Duffing(omega, beta=0.0), R, 0.0, args.fps, n_frames, "yoshida4", 4)
+    exact = R * np.cos(omega * np.arange(n_frames) / args.fps)
+    linear_error = np.abs(x[0] - exact).max()
+    print(f"linear limit: max |x - R cos(omega t)| = {linear_error:.1e} over {args.t_max:g} s")
+    if linear_error > 1e-6:
+        failures.append(f"linear limit error {linear_error:.1e}")
+    x, _, _, stats = integrate_adaptive(Duffing(omega, beta=0.0), R, 0.0, args.fps, n_frames,
+                                        rtol=1e-8)
+    linear_error = np.abs(x[0] - exact).max()
+    print(f"linear limit, dopri5 rtol 1e-8: max |x - R cos(omega t)| = {linear_error:.1e} "
+          f"in {stats.steps} steps for {n_frames} frames")
+    if linear_error > 1e-5:
+        failures.append(f"linear limit error {linear_error:.1e} with dopri5")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Microbenchmark of the kinematics precompute.
+
+Compares the original script's precompute (four ``omega * t`` products, two
+``cos``, two ``sin`` and two copies) with the fused kernel in
+:func:`shmlib.kinematics.circular_motion`, with and without preallocated
+output buffers, and times the batch engine on a parameter study.
+
+Run from the repository root::
+
+    python benchmarks/bench_kinematics.py [--samples N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shmlib.kinematics import batch_circular_motion, circular_motion  # noqa: E402
+
+
+def reference_precompute(R, omega, t_full):
+    """The precompute as originally written in SHM.py."""
+    x_full = R * np.cos(omega * t_full)
+    y_full = R * np.sin(omega * t_full)
+    z_full = np.zeros_like(t_full)
+    d_full = x_full.copy()
+    v_full = -R * omega * np.sin(omega * t_full)
+    a_full = -R * omega**2 * np.cos(omega * t_full)
+    F_full = a_full.copy()
+    return x_full, y_full, z_full, d_full, v_full, a_full, F_full
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=float, default=1e7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    R, omega = 1.0, 2 * np.pi / 5
+    t = np.linspace(0, 10, int(args.samples))
+    out = tuple(np.empty_like(t) for _ in range(4))
+
+    fused = circular_motion(R, omega, t)
+    reference = reference_precompute(R, omega, t)
+    error = max(np.abs(ref - new).max() for ref, new in
+                zip(reference, (fused.x, fused.y, fused.z, fused.d, fused.v, fused.a, fused.F)))
+
+    rows = [
+        ("reference (SHM.py)", best_time(lambda: reference_precompute(R, omega, t), args.repeat)),
+        ("fused", best_time(lambda: circular_motion(R, omega, t), args.repeat)),
+        ("fused, out= buffers", best_time(lambda: circular_motion(R, omega, t, out=out),
+                                          args.repeat)),
+    ]
+    print(f"n = {len(t):.0e} samples, max |fused - reference| = {error:.1e}")
+    for name, seconds in rows:
+        print(f"  {name:<22} {seconds * 1000:8.1f} ms   {rows[0][1] / seconds:5.2f}x")
+
+    n_osc, n_frames = 100_000, 300
+    rng = np.random.default_rng(0)
+    radii = rng.uniform(0.5, 2.0, n_osc)
+    omegas = rng.uniform(0.5, 5.0, n_osc)
+    phases = rng.uniform(0, 2 * np.pi, n_osc)
+    t_batch = np.linspace(0, 10, n_frames)
+    print(f"batch of {n_osc} oscillators x {n_frames} frames")
+    for dtype in (np.float64, np.float32):
+        buffers = tuple(np.empty((n_osc, n_frames), dtype=dtype) for _ in range(4))
+        seconds = best_time(lambda: batch_circular_motion(radii, omegas, t_batch, phases,
+                                                          dtype=dtype, out=buffers),
+                            args.repeat)
+        print(f"  {np.dtype(dtype).name:<22} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Frame rendering benchmark and correctness check for the compositor.
+
+The same frames are drawn three ways on an Agg canvas:
+
+* ``full``: ``Scene.render_rgb``, a full figure draw per frame;
+* ``composite``: a :class:`~shmlib.render.FrameCompositor` drawing every
+  moving artist per frame on top of a cached background;
+* ``dedupe``: the compositor also reusing the 3D panel from one period
+  earlier.
+
+``dedupe`` must be pixel-identical to ``composite``. Both are also
+compared against ``full``, where the moving artists are drawn in z-order
+with the axes rather than on top, so a few antialiased edge pixels may
+differ, by up to the full 255; no frame may have more than
+``--max-differing`` of its pixels differ. The script exits with status 1
+if either check fails.
+
+Run from the repository root::
+
+    python benchmarks/bench_render.py [--periods N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+
+from shmlib.render import FrameCompositor  # noqa: E402
+from shmlib.scene import Scene  # noqa: E402
+
+R = 1.0
+omega = 2 * np.pi / 5
+fps = 30
+
+
+def renderer(scene, mode):
+    """Return a function drawing one frame of ``scene`` as an RGB array."""
+    if mode == "full":
+        def draw(frame):
+            scene.update(frame)
+            scene.fig.canvas.draw()
+            return np.asarray(scene.fig.canvas.buffer_rgba())[..., :3]
+        return draw, None
+
+    compositor = FrameCompositor(scene, dedupe=mode == "dedupe")
+    return (lambda frame: np.asarray(compositor.render(frame))[..., :3]), compositor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--periods", type=int, default=2,
+                        help="periods of the motion to render")
+    parser.add_argument("--max-differing", type=float, default=0.0001,
+                        help="largest fraction of a frame's pixels that may differ "
+                             "from the full render")
+    args = parser.parse_args()
+
+    # The modes draw the same frame in turn and are compared as they go, so
+    # no more than one frame per mode is held in memory.
+    t_max = args.periods * 2 * np.pi / omega
+    modes = ("full", "composite", "dedupe")
+    renderers = {}
+    for mode in modes:
+        scene = Scene(R, omega, t_max, fps, blit=mode != "full", periodic=True)
+        renderers[mode] = renderer(scene, mode)
+    n_frames = scene.n_frames
+    seconds = dict.fromkeys(modes, 0.0)
+    max_diff = dict.fromkeys(modes, 0)
+    differing = dict.fromkeys(modes, 0)
+    worst = dict.fromkeys(modes, 0)  # most pixels differing in one frame
+    identical = True
+
+    for frame in range(n_frames):
+        images = {}
+        for mode in modes:
+            started = time.perf_counter()
+            image = renderers[mode][0](frame)
+            seconds[mode] += time.perf_counter() - started
+            images[mode] = image.astype(np.int16)
+        for mode in modes:
+            diff = np.abs(images[mode] - images["full"])
+            max_diff[mode] = max(max_diff[mode], int(diff.max()))
+            count = int(np.count_nonzero(diff.any(axis=-1)))
+            differing[mode] += count
+            worst[mode] = max(worst[mode], count)
+        identical &= np.array_equal(images["dedupe"], images["composite"])
+
+    frame_pixels = images["full"].shape[0] * images["full"].shape[1]
+    pixels = n_frames * frame_pixels
+    print(f"{n_frames} frames ({args.periods} periods)")
+    print(f"{'mode':<10} {'ms/frame':>9} {'max diff':>9} {'pixels differ':>14} "
+          f"{'worst frame':>12}")
+    for mode in modes:
+        print(f"{mode:<10} {seconds[mode] / n_frames * 1000:9.2f} {max_diff[mode]:9d} "
+              f"{differing[mode] / pixels:14.4%} {worst[mode] / frame_pixels:12.4%}")
+
+    compositor = renderers["dedupe"][1]
+    print(f"3D layers reused for {compositor.hits} frames, "
+          f"cache {compositor.cached_bytes() / 2**20:.1f} MiB")
+
+    failed = False
+    if not identical:
+        print("FAIL: deduplicated frames differ from the composited render")
+        failed = True
+    for mode in ("composite", "dedupe"):
+        if worst[mode] > args.max_differing * frame_pixels:
+            print(f"FAIL: {mode} frames differ from the full render in up to "
+                  f"{worst[mode] / frame_pixels:.4%} of their pixels "
+                  f"(tolerance {args.max_differing:.4%})")
+            failed = True
+    if failed:
+        return 1
+    print(f"deduplicated frames are identical to the composited render, and both are "
+          f"within {args.max_differing:.4%} of the full render")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Startup benchmark for the two entry points.
+
+Each target is imported in a fresh interpreter under ``python -X importtime``
+and the script reports the wall time of that interpreter and the total
+cumulative import time of its top-level imports. A target whose import time
+exceeds its budget makes the script exit with status 1, so the budget can be
+checked in CI.
+
+Run from the repository root::
+
+    python benchmarks/bench_startup.py [--repeat N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# target name -> (modules imported, import-time budget [ms] or None)
+TARGETS = {
+    "shmlib": (["shmlib"], 250),
+    "SHM.py (import only)": (["SHM"], 250),
+    "SHMstreamlit.py imports": (
+        ["streamlit", "shmlib.cache", "shmlib.client", "shmlib.render"], 1500),
+    # Deferred until a render is needed; reported for reference only.
+    "matplotlib.pyplot (deferred)": (["matplotlib.pyplot", "mpl_toolkits.mplot3d"], None),
+}
+
+
+def total_import_time_ms(stderr):
+    """Sum the cumulative times of the top-level entries of -X importtime."""
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two extra spaces per level.
+        if cumulative_us.strip().isdigit() and not name.startswith("  "):
+            total_us += int(cumulative_us)
+    return total_us / 1000
+
+
+def measure(modules):
+    """Return (wall time [ms], import time [ms]) of importing ``modules``."""
+    code = "import " + ", ".join(modules)
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    return wall_ms, total_import_time_ms(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="imports per target; the best run is reported")
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'target':<32} {'wall [ms]':>10} {'import [ms]':>12} {'budget [ms]':>12}")
+    for name, (modules, budget) in TARGETS.items():
+        wall_ms, import_ms = min(measure(modules) for _ in range(args.repeat))
+        budget_text = "-" if budget is None else str(budget)
+        print(f"{name:<32} {wall_ms:>10.0f} {import_ms:>12.0f} {budget_text:>12}")
+        if budget is not None and import_ms > budget:
+            over_budget.append(name)
+
+    if over_budget:
+        print("over the import-time budget: " + ", ".join(over_budget))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
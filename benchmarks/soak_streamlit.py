@@ -0,0 +1,111 @@
+"""Soak test of SHMstreamlit.py: memory must stay flat across reruns.
+
+The page is rerun in-process with Streamlit's ``AppTest``, the way a server
+reruns it for every page view and widget interaction, alternating between
+the server-video and in-the-browser modes. Every ``--render-every`` reruns
+the in-memory and on-disk render caches are emptied, so the next rerun
+renders and encodes the video again. The resident set size is sampled
+throughout; if it grows by more than ``--max-growth-mib`` after the
+warm-up, or any matplotlib figure outlives its render, the script exits
+with status 1.
+
+Run from the repository root (ffmpeg must be on the PATH)::
+
+    python benchmarks/soak_streamlit.py [--reruns N] [--render-every N]
+"""
+
+import argparse
+import gc
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def rss_mib():
+    """Return the current resident set size of this process [MiB]."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Not Linux: fall back to the peak, which still bounds any growth.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def live_figures():
+    """Return the number of matplotlib figures still in memory."""
+    if "matplotlib.figure" not in sys.modules:
+        return 0
+    from matplotlib.figure import Figure
+
+    gc.collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--render-every", type=int, default=100,
+                        help="reruns between forced renders")
+    parser.add_argument("--warmup", type=int, default=20,
+                        help="reruns before the baseline memory sample")
+    parser.add_argument("--max-growth-mib", type=float, default=64)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="shm-soak-")
+    os.environ["SHM_RENDER_CACHE_DIR"] = cache_dir
+
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "SHMstreamlit.py"), default_timeout=900)
+    renders = 0
+    baseline = None
+    started = time.perf_counter()
+    print(f"{'rerun':>6} {'renders':>8} {'RSS [MiB]':>10} {'figures':>8}")
+    try:
+        for rerun in range(args.reruns):
+            if rerun % args.render_every == 0:
+                st.cache_data.clear()
+                for name in os.listdir(cache_dir):
+                    os.remove(os.path.join(cache_dir, name))
+                renders += 1
+            # Even reruns serve the video, odd ones the browser-side page.
+            mode = "In the browser" if rerun % 2 else "Server video"
+            if rerun:
+                app.sidebar.radio[0].set_value(mode)
+            app.run()
+            if app.exception:
+                print(f"rerun {rerun} raised: {app.exception[0].message}")
+                return 1
+
+            if rerun + 1 == args.warmup:
+                baseline = rss_mib()
+            if (rerun + 1) % args.render_every == 0 or rerun + 1 == args.reruns:
+                print(f"{rerun + 1:6d} {renders:8d} {rss_mib():10.1f} {live_figures():8d}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    final = rss_mib()
+    figures = live_figures()
+    print(f"{args.reruns} reruns, {renders} renders in {time.perf_counter() - started:.0f} s")
+    if baseline is None:
+        print("too few reruns to measure growth after the warm-up")
+        return 0
+    growth = final - baseline
+    print(f"RSS {baseline:.1f} MiB after {args.warmup} reruns, {final:.1f} MiB at the end "
+          f"(+{growth:.1f} MiB, budget {args.max_growth_mib:g} MiB)")
+    if growth > args.max_growth_mib or figures:
+        print(f"FAIL: memory grew by {growth:.1f} MiB with {figures} figures alive")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""Reusable building blocks for the circular motion / SHM animations.
+
+Importing the package only loads numpy; matplotlib is imported when a
+:class:`Scene` is built.
+"""
+
+from shmlib.cache import DiskCache, cache_key
+from shmlib.damped import DampedDrivenKinematics, damped_driven_motion
+from shmlib.decimate import MinMaxPyramid, minmax_decimate
+from shmlib.integrators import (Duffing, IntegratedKinematics, IntegrationStats, Pendulum,
+                                integrate, integrate_adaptive)
+from shmlib.kinematics import (ClosedFormKinematics, Kinematics, PeriodicKinematics,
+                               SampledKinematics, batch_circular_motion, circular_motion,
+                               TimeBase, frames_per_period, kinematics)
+from shmlib.live import FrameClock
+from shmlib.ring import RingBuffer
+from shmlib.scene import Scene
+
+__all__ = ["ClosedFormKinematics", "DampedDrivenKinematics", "DiskCache", "Duffing",
+           "FrameClock", "IntegratedKinematics", "IntegrationStats", "Kinematics",
+           "MinMaxPyramid", "Pendulum", "PeriodicKinematics", "RingBuffer", "SampledKinematics",
+           "Scene", "TimeBase", "batch_circular_motion", "cache_key", "circular_motion",
+           "damped_driven_motion", "frames_per_period", "integrate", "integrate_adaptive",
+           "kinematics", "minmax_decimate"]
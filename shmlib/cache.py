@@ -0,0 +1,148 @@
+"""Content-addressed on-disk cache for rendered animations.
+
+Rendered videos are stored as one file per entry, named by a hash of the
+parameters that produced them, so any number of processes (Streamlit
+replicas behind a load balancer, or a server after a restart) can share one
+cache directory. Writes go to a temporary file that is atomically renamed
+into place, so readers only ever see complete entries, and the directory is
+kept under a byte budget by evicting the least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CACHE_FORMAT_VERSION = 3  # Bump to invalidate entries written by older code
+TEMP_PREFIX = ".tmp-"
+STALE_TEMP_AGE = 3600  # Seconds after which an orphaned temp file is removed
+
+
+def cache_key(**params):
+    """Return a stable hex digest identifying a render with ``params``.
+
+    Floats are serialised with ``repr`` precision, so two renders share a key
+    only if their parameters are exactly equal.
+    """
+    payload = json.dumps({"version": CACHE_FORMAT_VERSION, **params},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """A directory of immutable byte blobs with a total size budget.
+
+    Parameters
+    ----------
+    directory : str
+        Where the entries are stored; created if missing.
+    max_bytes : int
+        Total size the entries may occupy before the least recently used
+        ones are evicted.
+    suffix : str
+        File extension of the entries, e.g. ``".mp4"``.
+    """
+
+    def __init__(self, directory, max_bytes, suffix=""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        """Return the bytes stored under ``key``, or None if absent."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        # Refresh the modification time so eviction sees this entry as
+        # recently used. Another process may have evicted it meanwhile.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Atomically store ``data`` under ``key`` and enforce the budget.
+
+        Returns whether the entry was stored. An entry larger than the whole
+        budget would only be evicted again straight away, so it is never
+        written and every lookup of ``key`` stays a miss.
+        """
+        if len(data) > self.max_bytes:
+            return False
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates owner-only files; entries are shared between
+            # server processes that may run as different users.
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+        return True
+
+    def evict(self):
+        """Remove least recently used entries until the budget is met."""
+        entries = []
+        now = time.time()
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # removed by a concurrent eviction
+                if entry.name.startswith(TEMP_PREFIX):
+                    # Leftovers of writers that died before renaming.
+                    if now - stat.st_mtime > STALE_TEMP_AGE:
+                        _remove_quietly(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove_quietly(path)
+            total -= size
+
+    def total_bytes(self):
+        """Return the number of bytes currently held by complete entries."""
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith(TEMP_PREFIX):
+                    continue
+                try:
+                    total += entry.stat().st_size
+                except FileNotFoundError:
+                    pass
+        return total
+
+
+def _remove_quietly(path):
+    # Readers on POSIX keep their open handle, so removing an entry that is
+    # being read is safe; a concurrent evictor may already have removed it.
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,206 @@
+"""Browser-side rendering of the circular motion / SHM animation.
+
+Every quantity in the animation is closed form in ``omega * t``, so instead
+of rasterising and encoding frames on the server the page can ship just the
+parameters and let a small canvas script draw the 3D panel and the four
+time-series panels. The server's work per view is formatting one HTML
+string, and the sliders inside the page change the parameters without a
+round trip to the server.
+"""
+
+import json
+
+CLIENT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+  body { margin: 0; font-family: sans-serif; font-size: 13px; }
+  #controls { display: flex; gap: 1.5em; align-items: center; padding: 4px 0; }
+  #controls label { display: flex; gap: 0.5em; align-items: center; }
+  canvas { display: block; }
+</style>
+</head>
+<body>
+<div id="controls">
+  <button id="play">Pause</button>
+  <label>R <input id="R" type="range" min="0.2" max="2" step="0.05"><span id="R_val"></span> m</label>
+  <label>Period <input id="period" type="range" min="1" max="20" step="0.5"><span id="period_val"></span> s</label>
+</div>
+<canvas id="scene"></canvas>
+<script>
+const params = __PARAMS__;
+const canvas = document.getElementById("scene");
+const ctx = canvas.getContext("2d");
+const ratio = window.devicePixelRatio || 1;
+canvas.width = params.width * ratio;
+canvas.height = params.height * ratio;
+canvas.style.width = params.width + "px";
+canvas.style.height = params.height + "px";
+ctx.scale(ratio, ratio);
+
+const nFrames = Math.floor(params.t_max * params.fps);
+// Same sampling as the server render: frame k is at exactly k / fps.
+const dt = 1 / params.fps;
+
+// Axes are scaled for the largest R the slider allows, so changing R
+// visibly resizes the orbit and the traces instead of only the tick labels.
+const rMax = Math.max(parseFloat(document.getElementById("R").max), params.R);
+
+// Orthographic view matching ax3d.view_init(elev, azim).
+const elev = params.elev * Math.PI / 180, azim = params.azim * Math.PI / 180;
+function project(x, y, z, box) {
+  const lim = rMax * 1.2;
+  const sx = -x * Math.sin(azim) + y * Math.cos(azim);
+  const sy = z * Math.cos(elev) - (x * Math.cos(azim) + y * Math.sin(azim)) * Math.sin(elev);
+  const scale = Math.min(box.w, box.h) / (2 * lim * 1.8);
+  return [box.x + box.w / 2 + sx * scale, box.y + box.h / 2 - sy * scale];
+}
+
+function line3d(points, box, color, width, dash) {
+  ctx.save();
+  ctx.strokeStyle = color; ctx.lineWidth = width; ctx.setLineDash(dash || []);
+  ctx.beginPath();
+  points.forEach(([x, y, z], i) => {
+    const [px, py] = project(x, y, z, box);
+    if (i === 0) ctx.moveTo(px, py); else ctx.lineTo(px, py);
+  });
+  ctx.stroke();
+  ctx.restore();
+}
+
+function draw3d(box, t) {
+  const { R, omega } = params;
+  ctx.fillStyle = "black"; ctx.textAlign = "center";
+  ctx.fillText("3D Circular Motion", box.x + box.w / 2, box.y + 14);
+  const lim = rMax * 1.2;
+  line3d([[-lim, 0, 0], [lim, 0, 0]], box, "#bbb", 1);
+  line3d([[0, -lim, 0], [0, lim, 0]], box, "#bbb", 1);
+  line3d([[0, 0, -lim], [0, 0, lim]], box, "#bbb", 1);
+  const circle = [];
+  for (let i = 0; i <= 100; i++) {
+    const th = 2 * Math.PI * i / 100;
+    circle.push([R * Math.cos(th), R * Math.sin(th), 0]);
+  }
+  line3d(circle, box, "rgba(128,128,128,0.5)", 0.5);
+
+  const x = R * Math.cos(omega * t), y = R * Math.sin(omega * t), z = 0;
+  line3d([[0, 0, 0], [x, y, z]], box, "red", 2, [2, 3]);
+  line3d([[x, 0, 0], [x, 0, z]], box, "green", 1, [6, 4]);
+
+  // Centripetal force arrow with a simple head drawn in screen space.
+  const fx = -omega * omega * x, fy = -omega * omega * y;
+  const [x0, y0] = project(x, y, z, box), [x1, y1] = project(x + fx, y + fy, z, box);
+  const ang = Math.atan2(y1 - y0, x1 - x0), head = 0.2 * Math.hypot(x1 - x0, y1 - y0);
+  ctx.save();
+  ctx.strokeStyle = "orange"; ctx.lineWidth = 1.5;
+  ctx.beginPath();
+  ctx.moveTo(x0, y0); ctx.lineTo(x1, y1);
+  ctx.moveTo(x1, y1); ctx.lineTo(x1 - head * Math.cos(ang - 0.26), y1 - head * Math.sin(ang - 0.26));
+  ctx.moveTo(x1, y1); ctx.lineTo(x1 - head * Math.cos(ang + 0.26), y1 - head * Math.sin(ang + 0.26));
+  ctx.stroke();
+  ctx.restore();
+
+  ctx.fillStyle = "red";
+  ctx.beginPath(); ctx.arc(x0, y0, 5, 0, 2 * Math.PI); ctx.fill();
+}
+
+// Time-series panels, top to bottom, as in the server-rendered figure.
+const panels = [
+  { title: "Force vs Time", label: "F (N)", color: "orange",
+    f: (t) => -params.R * params.omega ** 2 * Math.cos(params.omega * t),
+    lim: () => rMax * params.omega ** 2 * 1.2 },
+  { title: "Displacement vs Time", label: "d (m)", color: "red",
+    f: (t) => params.R * Math.cos(params.omega * t),
+    lim: () => rMax * 1.2 },
+  { title: "Velocity vs Time", label: "v (m/s)", color: "magenta",
+    f: (t) => -params.R * params.omega * Math.sin(params.omega * t),
+    lim: () => Math.abs(rMax * params.omega) * 1.2 },
+  { title: "Acceleration vs Time", label: "a (m/s\\u00b2)", color: "cyan",
+    f: (t) => -params.R * params.omega ** 2 * Math.cos(params.omega * t),
+    lim: () => rMax * params.omega ** 2 * 1.2 },
+];
+
+function drawPanel(panel, box, frame) {
+  const lim = panel.lim();
+  const px = (t) => box.x + t / params.t_max * box.w;
+  const py = (v) => box.y + box.h / 2 - v / lim * box.h / 2;
+  ctx.strokeStyle = "black"; ctx.lineWidth = 1;
+  ctx.strokeRect(box.x, box.y, box.w, box.h);
+  ctx.fillStyle = "black"; ctx.textAlign = "center";
+  ctx.fillText(panel.title, box.x + box.w / 2, box.y - 5);
+  ctx.save();
+  ctx.translate(box.x - 28, box.y + box.h / 2); ctx.rotate(-Math.PI / 2);
+  ctx.fillText(panel.label, 0, 0);
+  ctx.restore();
+  ctx.textAlign = "right";
+  ctx.fillText(lim.toFixed(2), box.x - 3, box.y + 10);
+  ctx.fillText((-lim).toFixed(2), box.x - 3, box.y + box.h);
+
+  ctx.save();
+  ctx.strokeStyle = panel.color; ctx.lineWidth = 2;
+  ctx.beginPath();
+  for (let i = 0; i <= frame; i++) {
+    const t = i * dt;
+    if (i === 0) ctx.moveTo(px(t), py(panel.f(t))); else ctx.lineTo(px(t), py(panel.f(t)));
+  }
+  ctx.stroke();
+  ctx.restore();
+}
+
+function draw(frame) {
+  const W = params.width, H = params.height;
+  ctx.clearRect(0, 0, W, H);
+  draw3d({ x: 0, y: 0, w: W / 2, h: H }, frame * dt);
+  const left = W / 2 + 50, top = 25, rowH = H / 4;
+  panels.forEach((panel, i) => {
+    drawPanel(panel, { x: left, y: top + i * rowH, w: W - left - 10, h: rowH - 45 }, frame);
+  });
+  ctx.fillStyle = "black"; ctx.textAlign = "center";
+  ctx.fillText("Time (s)", left + (W - left - 10) / 2, H - 5);
+}
+
+// Controls: parameter changes only touch this page.
+const playButton = document.getElementById("play");
+const rInput = document.getElementById("R"), periodInput = document.getElementById("period");
+function syncLabels() {
+  document.getElementById("R_val").textContent = params.R.toFixed(2);
+  document.getElementById("period_val").textContent = (2 * Math.PI / params.omega).toFixed(1);
+}
+rInput.value = params.R;
+periodInput.value = 2 * Math.PI / params.omega;
+syncLabels();
+rInput.addEventListener("input", () => { params.R = parseFloat(rInput.value); syncLabels(); });
+periodInput.addEventListener("input", () => {
+  params.omega = 2 * Math.PI / parseFloat(periodInput.value); syncLabels();
+});
+
+let playing = true, start = performance.now(), pausedFrame = 0;
+playButton.addEventListener("click", () => {
+  playing = !playing;
+  playButton.textContent = playing ? "Pause" : "Play";
+  start = performance.now() - pausedFrame / params.fps * 1000;
+});
+
+function tick(now) {
+  if (playing) pausedFrame = Math.floor((now - start) / 1000 * params.fps) % nFrames;
+  draw(pausedFrame);
+  requestAnimationFrame(tick);
+}
+requestAnimationFrame(tick);
+</script>
+</body>
+</html>
+"""
+
+
+def client_animation_html(R, omega, t_max, fps, width=1000, height=800,
+                          elev=20, azim=45):
+    """Return a standalone HTML page that animates the scene in the browser.
+
+    Only the parameters are embedded; the page evaluates the closed-form
+    kinematics itself for every displayed frame.
+    """
+    params = {"R": R, "omega": omega, "t_max": t_max, "fps": fps,
+              "width": width, "height": height, "elev": elev, "azim": azim}
+    return CLIENT_TEMPLATE.replace("__PARAMS__", json.dumps(params))
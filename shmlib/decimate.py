@@ -0,0 +1,125 @@
+"""Level-of-detail decimation of time series for drawing.
+
+A line with far more samples than its axes has pixel columns costs draw
+time without changing what is seen. :func:`minmax_decimate` splits a series
+into one bucket of consecutive samples per pixel column and keeps only the
+first, last, smallest and largest sample of each (the "M4" scheme), in
+their original order. The decimated line passes through every extreme of
+the full one, so peaks are exact, and it has at most four points per
+column however many samples there are. :class:`MinMaxPyramid` precomputes
+the buckets of a whole series once, so that every prefix of it can then be
+decimated without touching each sample again.
+"""
+
+import operator
+
+import numpy as np
+
+POINTS_PER_BUCKET = 4  # first, min, max and last
+
+
+def minmax_decimate(t, y, n_buckets):
+    """Return ``(t, y)`` reduced to at most four samples per bucket.
+
+    ``t`` and ``y`` are 1-D arrays of equal length, with ``t`` evenly
+    spaced so that equal runs of samples span equal widths on screen.
+    Series that already have no more than ``4 * n_buckets`` samples are
+    returned unchanged.
+    """
+    n = len(y)
+    n_buckets = max(int(n_buckets), 1)
+    if n <= POINTS_PER_BUCKET * n_buckets:
+        return t, y
+
+    size = -(-n // n_buckets)  # samples per bucket, rounded up
+    full = n // size
+    head = y[:full * size].reshape(full, size)
+    index = (_bucket_extremes(head) + np.arange(0, full * size, size)[:, None]).ravel()
+    if full * size < n:
+        tail = y[full * size:].reshape(1, -1)
+        index = np.concatenate((index, full * size + _bucket_extremes(tail).ravel()))
+
+    # A bucket's first or last sample is often also its extreme.
+    index = index[np.concatenate(([True], index[1:] != index[:-1]))]
+    return t[index], y[index]
+
+
+def _bucket_extremes(buckets):
+    # Index of the first, smallest, largest and last sample of each row,
+    # sorted so the points are drawn in time order.
+    index = np.empty((len(buckets), POINTS_PER_BUCKET), dtype=np.intp)
+    index[:, 0] = 0
+    index[:, 1] = buckets.argmin(axis=1)
+    index[:, 2] = buckets.argmax(axis=1)
+    index[:, 3] = buckets.shape[1] - 1
+    index.sort(axis=1)
+    return index
+
+
+class MinMaxPyramid:
+    """Min/max index of a series at every power-of-two bucket size.
+
+    Level ``L`` holds, for each bucket ``j`` of samples
+    ``[j * 2**L, (j + 1) * 2**L)``, the index of its smallest and largest
+    sample. Building all levels once costs O(n) time and about two indices
+    per sample; afterwards :meth:`prefix` decimates any prefix of the series
+    in O(n_buckets + log n), instead of the O(n) of :func:`minmax_decimate`.
+    """
+
+    def __init__(self, y):
+        self.y = y = np.asarray(y)
+        dtype = np.int32 if len(y) < 2**31 else np.int64
+        self.levels = [None]  # level 0 is the samples themselves
+        lo = hi = np.arange(len(y), dtype=dtype)
+        while len(lo) >= 2:
+            stop = len(lo) // 2 * 2
+            first, second = lo[0:stop:2], lo[1:stop:2]
+            lo = np.where(y[second] < y[first], second, first)
+            first, second = hi[0:stop:2], hi[1:stop:2]
+            hi = np.where(y[second] > y[first], second, first)
+            self.levels.append((lo, hi))
+
+    def __len__(self):
+        return len(self.y)
+
+    def prefix(self, stop, n_buckets):
+        """Return the indices of the decimated samples ``[0, stop)``.
+
+        The prefix is covered by the largest power-of-two buckets that still
+        give at least ``n_buckets`` of them (so between ``n_buckets`` and
+        ``2 * n_buckets``), plus at most one smaller bucket per level for
+        the remainder, and each contributes its first, smallest, largest and
+        last sample. Short prefixes are returned whole.
+        """
+        stop = min(operator.index(stop), len(self.y))
+        level = (stop // max(int(n_buckets), 1)).bit_length() - 1
+        level = min(max(level, 0), len(self.levels) - 1)
+        if level == 0:
+            return np.arange(stop)
+
+        full = stop >> level
+        blocks = [self._buckets(level, 0, full)]
+        start = full << level
+        for lower in range(level - 1, -1, -1):
+            if stop - start >= 1 << lower:
+                bucket = start >> lower
+                blocks.append(self._buckets(lower, bucket, bucket + 1))
+                start += 1 << lower
+
+        index = np.concatenate(blocks)
+        index.sort(axis=1)
+        index = index.ravel()
+        return index[np.concatenate(([True], index[1:] != index[:-1]))]
+
+    def _buckets(self, level, start, stop):
+        # First, smallest, largest and last sample of buckets start..stop-1.
+        index = np.empty((stop - start, POINTS_PER_BUCKET), dtype=np.intp)
+        index[:, 0] = np.arange(start, stop) << level
+        index[:, 3] = index[:, 0] + (1 << level) - 1
+        if level == 0:
+            index[:, 1] = index[:, 2] = index[:, 0]
+        else:
+            lo, hi = self.levels[level]
+            index[:, 1] = lo[start:stop]
+            index[:, 2] = hi[start:stop]
+        return index
@@ -0,0 +1,330 @@
+"""Numerical integration of nonlinear oscillators without a closed form.
+
+The large-amplitude pendulum and the Duffing oscillator have no elementary
+solution, so their frames are found by stepping ``x'' = a(x)`` forward in
+time. The steppers here are symplectic: they conserve a slightly perturbed
+energy exactly, so the energy error stays bounded however long the run,
+instead of drifting like that of an explicit Runge-Kutta method. Each
+stepper updates ``x`` and ``v`` in place for a whole batch of initial
+conditions at once, and :func:`integrate` writes the states at the frame
+times ``k / fps`` straight into preallocated ``(n, n_frames)`` arrays.
+
+=============  =====  ===============================
+method         order  force evaluations per step
+=============  =====  ===============================
+``verlet``     2      1 (velocity Verlet, kick-drift-kick)
+``leapfrog``   2      1 (position Verlet, drift-kick-drift)
+``yoshida4``   4      3 (Yoshida's triple jump of Verlet steps)
+=============  =====  ===============================
+
+:func:`integrate_adaptive` instead takes Dormand-Prince 5(4) steps whose
+size follows the local error estimate rather than the frame rate, and
+fills the frames by the method's dense-output interpolant, so a smooth
+motion costs far fewer force evaluations than it has frames.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from shmlib.kinematics import Kinematics, SampledKinematics, TimeBase, sample_peaks
+
+# Yoshida's fourth-order composition: Verlet steps of w1 h, w0 h and w1 h.
+YOSHIDA_W1 = 1 / (2 - 2 ** (1 / 3))
+YOSHIDA_W0 = -(2 ** (1 / 3)) * YOSHIDA_W1
+
+
+class Pendulum:
+    """Simple pendulum, ``x'' = -omega^2 sin(x)``, with ``x`` the angle [rad].
+
+    ``omega`` is the small-amplitude angular frequency, ``sqrt(g / L)``.
+    """
+
+    def __init__(self, omega):
+        self.omega = omega
+
+    def acceleration(self, x, out=None):
+        """Return the acceleration at ``x``, written into ``out`` if given."""
+        out = np.sin(x, out=out)
+        out *= -self.omega**2
+        return out
+
+    def energy(self, x, v):
+        """Return the energy per unit mass (per ``L**2``) at ``(x, v)``."""
+        return 0.5 * v**2 + self.omega**2 * (1 - np.cos(x))
+
+
+class Duffing:
+    """Undamped Duffing oscillator, ``x'' = -omega^2 x - beta x^3``.
+
+    A hardening spring for ``beta > 0`` and a softening one for ``beta < 0``.
+    """
+
+    def __init__(self, omega, beta=1.0):
+        self.omega = omega
+        self.beta = beta
+
+    def acceleration(self, x, out=None):
+        """Return the acceleration at ``x``, written into ``out`` if given."""
+        if out is None:
+            out = np.empty_like(x, dtype=float)
+        np.multiply(x, x, out=out)
+        out *= -self.beta
+        out -= self.omega**2
+        out *= x
+        return out
+
+    def energy(self, x, v):
+        """Return the energy per unit mass at ``(x, v)``."""
+        return 0.5 * v**2 + 0.5 * self.omega**2 * x**2 + 0.25 * self.beta * x**4
+
+
+def verlet_step(model, x, v, a, h):
+    """Advance ``x`` and ``v`` by ``h`` with velocity Verlet.
+
+    ``a`` must hold the acceleration at ``x`` and is updated to the
+    acceleration at the new position, so each step evaluates the force once.
+    """
+    v += 0.5 * h * a
+    x += h * v
+    model.acceleration(x, out=a)
+    v += 0.5 * h * a
+
+
+def leapfrog_step(model, x, v, a, h):
+    """Advance ``x`` and ``v`` by ``h`` with the drift-kick-drift leapfrog.
+
+    ``a`` is scratch space; the force is evaluated once, at the midpoint.
+    """
+    x += 0.5 * h * v
+    model.acceleration(x, out=a)
+    v += h * a
+    x += 0.5 * h * v
+
+
+def yoshida4_step(model, x, v, a, h):
+    """Advance ``x`` and ``v`` by ``h`` with Yoshida's fourth-order method.
+
+    Three velocity Verlet steps of ``w1 h``, ``w0 h`` and ``w1 h`` (with
+    ``w0 < 0``), so ``a`` follows the same convention as :func:`verlet_step`.
+    """
+    verlet_step(model, x, v, a, YOSHIDA_W1 * h)
+    verlet_step(model, x, v, a, YOSHIDA_W0 * h)
+    verlet_step(model, x, v, a, YOSHIDA_W1 * h)
+
+
+STEPPERS = {"verlet": verlet_step, "leapfrog": leapfrog_step, "yoshida4": yoshida4_step}
+FORCE_EVALUATIONS = {"verlet": 1, "leapfrog": 1, "yoshida4": 3}  # per step
+
+
+def integrate(model, x0, v0, fps, n_frames, method="yoshida4", substeps=1, out=None):
+    """Integrate a batch of oscillators and return their frames.
+
+    Parameters
+    ----------
+    model : Pendulum or Duffing
+        Anything with an ``acceleration(x, out=None)`` method.
+    x0, v0 : array_like
+        Initial positions and velocities, broadcast to a common shape
+        ``(n,)``.
+    fps : float
+        Frames per second; frame ``k`` is the state at ``t = k / fps``.
+    n_frames : int
+        Number of frames.
+    method : str
+        ``"verlet"``, ``"leapfrog"`` or ``"yoshida4"``.
+    substeps : int
+        Integration steps per frame, each of ``1 / (fps * substeps)``
+        seconds.
+    out : tuple of ndarray or None
+        Preallocated ``(x, v, a)`` arrays of shape ``(n, n_frames)`` to
+        write the frames into; allocated if None.
+
+    Returns
+    -------
+    x, v, a : ndarray
+        Position, velocity and acceleration of each oscillator (rows) at
+        each frame (columns).
+    """
+    step = STEPPERS[method]
+    x, v = np.broadcast_arrays(np.atleast_1d(np.asarray(x0, dtype=float)),
+                               np.atleast_1d(np.asarray(v0, dtype=float)))
+    x, v = x.copy(), v.copy()
+    if out is None:
+        out = tuple(np.empty((len(x), n_frames)) for _ in range(3))
+    xs, vs, accs = out
+    a = model.acceleration(x)
+    h = 1 / (fps * substeps)
+
+    for k in range(n_frames):
+        xs[:, k] = x
+        vs[:, k] = v
+        if k + 1 < n_frames:
+            for _ in range(substeps):
+                step(model, x, v, a, h)
+    # One vectorised force evaluation for every frame, whichever the method.
+    model.acceleration(xs, out=accs)
+    return xs, vs, accs
+
+
+# Dormand-Prince 5(4) tableau (first same as last), the difference between
+# its fifth- and fourth-order weights, and the coefficients of its
+# fourth-order dense output in powers of theta (as in Hairer, Norsett and
+# Wanner, and scipy's RK45).
+DOPRI_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+DOPRI_E = np.array([-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
+DOPRI_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933,
+     87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408,
+     701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+])
+SAFETY = 0.9  # fraction of the step size the error estimate allows
+MIN_FACTOR, MAX_FACTOR = 0.2, 10.0  # limits on the change of step size
+
+
+class IntegrationStats(NamedTuple):
+    """What an adaptive integration cost and how accurate it expects to be."""
+    steps: int  # accepted steps
+    rejected: int  # steps retried with a smaller size
+    rhs_evaluations: int  # force evaluations, each over the whole batch
+    max_error: float  # largest local error estimate of an accepted step
+    total_error: float  # sum of the local error estimates, a rough global bound
+
+
+def integrate_adaptive(model, x0, v0, fps, n_frames, rtol=1e-6, atol=1e-9, out=None):
+    """Integrate a batch of oscillators with adaptive Dormand-Prince steps.
+
+    The whole batch shares one step size, chosen so that the estimated
+    local error of every oscillator stays within ``atol + rtol * |y|`` in
+    both position and velocity. Steps are not aligned to frames: frame
+    ``k`` at ``t = k / fps`` is interpolated within the step that contains
+    it, with the method's fourth-order dense output.
+
+    Parameters are as for :func:`integrate`, with ``rtol`` and ``atol`` in
+    place of ``method`` and ``substeps``. Returns ``(x, v, a, stats)``,
+    ``stats`` being an :class:`IntegrationStats`.
+    """
+    x, v = np.broadcast_arrays(np.atleast_1d(np.asarray(x0, dtype=float)),
+                               np.atleast_1d(np.asarray(v0, dtype=float)))
+    if out is None:
+        out = tuple(np.empty((len(x), n_frames)) for _ in range(3))
+    xs, vs, accs = out
+    if n_frames == 0:
+        return xs, vs, accs, IntegrationStats(0, 0, 0, 0.0, 0.0)
+    y = np.stack((x, v))  # (2, n): position and velocity
+
+    def rhs(y):
+        return np.stack((y[1], model.acceleration(y[0])))
+
+    k = np.empty((7,) + y.shape)
+    k[0] = rhs(y)
+    evaluations = 1
+    steps = rejected = 0
+    max_error = total_error = 0.0
+    xs[:, 0], vs[:, 0] = y
+    t, t_end = 0.0, (n_frames - 1) / fps
+    h = _initial_step(y, k[0], rtol, atol, 1 / fps)
+    frame = 1
+    retried = False
+
+    while frame < n_frames:
+        h = min(h, t_end - t)
+        for stage in range(1, 7):
+            k[stage] = rhs(y + h * np.tensordot(DOPRI_A[stage], k[:stage], axes=1))
+        evaluations += 6
+        y_new = y + h * np.tensordot(DOPRI_A[6], k[:6], axes=1)
+        error = h * np.tensordot(DOPRI_E, k, axes=1)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        norm = float(np.abs(error / scale).max())
+        factor = MAX_FACTOR if norm == 0 else SAFETY * norm ** -0.2
+        if norm > 1:
+            rejected += 1
+            retried = True
+            h *= max(factor, MIN_FACTOR)
+            continue
+
+        # Fill the frames up to the end of the step from the interpolant.
+        if h == t_end - t:
+            t_new, stop = t_end, n_frames
+        else:
+            t_new = t + h
+            stop = min(int(t_new * fps) + 1, n_frames)
+        if stop > frame:
+            theta = (np.arange(frame, stop) / fps - t) / h
+            powers = np.cumprod(np.broadcast_to(theta, (4, len(theta))), axis=0)
+            q = np.tensordot(DOPRI_P.T, k, axes=1)  # (4, 2, n)
+            dense = y[:, :, None] + h * np.tensordot(q, powers, axes=(0, 0))
+            xs[:, frame:stop], vs[:, frame:stop] = dense
+            frame = stop
+
+        steps += 1
+        local = float(np.abs(error).max())
+        max_error = max(max_error, local)
+        total_error += local
+        t, y = t_new, y_new
+        k[0] = k[6]  # first same as last
+        # Right after a rejection the step must not grow straight back.
+        h *= min(factor, 1.0 if retried else MAX_FACTOR)
+        retried = False
+
+    model.acceleration(xs, out=accs)
+    return xs, vs, accs, IntegrationStats(steps, rejected, evaluations, max_error, total_error)
+
+
+def _initial_step(y, f, rtol, atol, h_max):
+    # A first step that moves the state by about rtol of itself (the
+    # starting-step heuristic of Hairer, Norsett and Wanner, without the
+    # trial Euler step), capped at one frame.
+    scale = atol + rtol * np.abs(y)
+    d0 = np.abs(y / scale).max()
+    d1 = np.abs(f / scale).max()
+    if d0 < 1e-5 or d1 < 1e-5:
+        return min(1e-6, h_max)
+    return min(0.01 * d0 / d1, h_max)
+
+
+class IntegratedKinematics(SampledKinematics):
+    """Precomputed frames of a nonlinear oscillator released from rest at ``R``.
+
+    The frames come from :func:`integrate` with ``substeps`` steps of the
+    symplectic ``method`` per frame, or for ``method="dopri5"`` from
+    :func:`integrate_adaptive` with tolerance ``rtol``, whose
+    :class:`IntegrationStats` are kept in :attr:`stats`. As for
+    :class:`~shmlib.damped.DampedDrivenKinematics`, the 3D particle is the
+    phase-space point ``(x, -v / omega)`` with ``omega`` the model's
+    small-amplitude angular frequency.
+    """
+
+    def __init__(self, model, R, t_max, fps, method="yoshida4", substeps=4, rtol=1e-8):
+        self.model = model
+        self.R = R
+        self.omega = model.omega
+        self.fps = fps
+        time = TimeBase(fps, int(t_max * fps))
+        if method == "dopri5":
+            xs, vs, accs, self.stats = integrate_adaptive(model, R, 0.0, fps, len(time), rtol)
+        else:
+            xs, vs, accs = integrate(model, R, 0.0, fps, len(time), method, substeps)
+            self.stats = None
+        x, v, a = xs[0], vs[0], accs[0]
+        # For a unit mass the force is F = a and the displacement is x.
+        self.samples = Kinematics(time, x, -v / abs(self.omega), np.zeros_like(x),
+                                  x, v, a, a)
+
+    def peaks(self):
+        """Return the largest magnitudes of d, v and a over the motion."""
+        return sample_peaks(self.samples)
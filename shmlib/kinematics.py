@@ -0,0 +1,285 @@
+"""Closed-form kinematics of uniform circular motion and its SHM projection.
+
+Only numpy is imported here, so the arrays can be computed, tested and
+benchmarked without loading matplotlib or streamlit.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Kinematics(NamedTuple):
+    """Sampled motion of one particle or of a batch of oscillators.
+
+    For one particle every field has the shape of ``t``. For a batch,
+    ``t`` has shape ``(n_frames,)`` and the other fields have shape
+    ``(n_oscillators, n_frames)``.
+    """
+
+    t: np.ndarray  # time [s] (a TimeBase in SampledKinematics.samples)
+    x: np.ndarray  # position on the circle [m]
+    y: np.ndarray
+    z: np.ndarray
+    d: np.ndarray  # displacement of the x-projection [m]
+    v: np.ndarray  # velocity of the projection [m/s]
+    a: np.ndarray  # acceleration of the projection [m/s²]
+    F: np.ndarray  # force on the projection, for a unit mass [N]
+
+
+def circular_motion(R, omega, t, out=None):
+    """Return the :class:`Kinematics` of circular motion sampled at ``t``.
+
+    The particle moves on a circle of radius ``R`` [m] in the xy-plane with
+    angular velocity ``omega`` [rad/s], starting on the positive x-axis.
+    ``out`` may be a tuple of four preallocated arrays with the shape of
+    ``t`` that receive ``x``, ``y``, ``v`` and ``a``, so repeated calls
+    allocate nothing but ``z``.
+    """
+    t = np.asarray(t, dtype=float)
+    x, y, v, a = _output_buffers(t.shape, t.dtype, out)
+
+    # The phase is computed once, into y, and replaced there by its sine.
+    np.multiply(omega, t, out=y)
+    _fill_from_phase(R, omega, x, y, v, a)
+    z = np.zeros_like(t)
+
+    # For a unit mass the force is F = a, and the displacement is the
+    # x-projection, so both are the same arrays rather than copies.
+    return Kinematics(t, x, y, z, x, v, a, a)
+
+
+def _output_buffers(shape, dtype, out):
+    if out is None:
+        return tuple(np.empty(shape, dtype=dtype) for _ in range(4))
+    for buffer in out:
+        if buffer.shape != shape:
+            raise ValueError(f"output buffer has shape {buffer.shape}, expected {shape}")
+    return out
+
+
+def _fill_from_phase(R, omega, x, y, v, a):
+    # Fused kernel: with the phase already in y, evaluate cos and sin once
+    # each and derive everything else by scaling, all in place.
+    np.cos(y, out=x)
+    np.sin(y, out=y)
+    x *= R
+    y *= R
+    np.multiply(y, -omega, out=v)          # v = -R omega sin(omega t)
+    np.multiply(x, -omega * omega, out=a)  # a = -R omega^2 cos(omega t)
+
+
+class TimeBase:
+    """Frame-exact timestamps: frame ``k`` is at ``k / fps`` seconds.
+
+    Indexing behaves like the array ``np.arange(n_frames) / fps`` but the
+    times are computed from the frame indices on demand, so nothing is
+    stored: an integer gives one time, and a slice or an integer array
+    gives an array of times. With ``n_frames`` None the time base is
+    unbounded, and slices must give their stop.
+    """
+
+    def __init__(self, fps, n_frames=None):
+        self.fps = fps
+        self.n_frames = n_frames
+
+    def __len__(self):
+        if self.n_frames is None:
+            raise TypeError("an unbounded TimeBase has no length")
+        return self.n_frames
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if self.n_frames is None:
+                if index.stop is None or min(index.start or 0, index.stop) < 0:
+                    raise IndexError("slices of an unbounded TimeBase need "
+                                     "non-negative start and stop")
+                frames = np.arange(index.start or 0, index.stop, index.step or 1)
+            else:
+                frames = np.arange(*index.indices(self.n_frames))
+            return frames / self.fps
+        frames = np.asarray(index)
+        if self.n_frames is not None:
+            if np.any((frames < -self.n_frames) | (frames >= self.n_frames)):
+                raise IndexError(f"frame index out of range for {self.n_frames} frames")
+            frames = np.where(frames < 0, frames + self.n_frames, frames)
+        times = frames / self.fps
+        return times if times.ndim else float(times)
+
+    def __array__(self, dtype=None, copy=None):
+        times = self[:]
+        return times if dtype is None else times.astype(dtype)
+
+
+def kinematics(R, omega, t_max, fps):
+    """Return the :class:`Kinematics` of every animation frame.
+
+    There are ``int(t_max * fps)`` frames, frame ``k`` at exactly ``k / fps``
+    seconds, so the last frame is one frame interval before ``t_max`` and a
+    loop of the animation has no repeated frame.
+    """
+    n_frames = int(t_max * fps)
+    return circular_motion(R, omega, TimeBase(fps, n_frames)[:])
+
+
+def batch_circular_motion(R, omega, t, phase=0.0, dtype=np.float64, out=None):
+    """Return the :class:`Kinematics` of many oscillators sampled at ``t``.
+
+    ``R``, ``omega`` and ``phase`` are scalars or 1-D arrays of length
+    ``n_oscillators`` (broadcast against each other); oscillator ``i`` is at
+    angle ``omega[i] * t + phase[i]``. Everything is computed with
+    broadcasting by the same fused kernel as :func:`circular_motion`, and
+    ``z`` is a read-only broadcast of zeros. Pass ``dtype=np.float32`` to
+    halve memory and time for large studies, and ``out`` (four
+    ``(n_oscillators, n_frames)`` arrays) to reuse buffers between calls.
+    """
+    R, omega, phase = (np.asarray(p, dtype=dtype).reshape(-1, 1)
+                       for p in np.broadcast_arrays(R, omega, phase))
+    t = np.asarray(t, dtype=dtype)
+    x, y, v, a = _output_buffers((len(R), len(t)), dtype, out)
+
+    np.multiply(omega, t, out=y)
+    y += phase
+    _fill_from_phase(R, omega, x, y, v, a)
+    z = np.broadcast_to(np.zeros((), dtype=dtype), x.shape)
+    return Kinematics(t, x, y, z, x, v, a, a)
+
+
+def frames_per_period(omega, fps, rtol=1e-9):
+    """Return the whole number of frames in one period, or None.
+
+    The motion repeats every ``2*pi/omega`` seconds; with frame ``k`` shown
+    at ``k / fps`` the frames repeat exactly only when ``fps`` times the
+    period is an integer (to within ``rtol``).
+    """
+    return loop_length(omega, fps, max_periods=1, rtol=rtol)
+
+
+def loop_length(omega, fps, max_periods=1000, rtol=1e-9):
+    """Return the fewest frames after which the animation repeats, or None.
+
+    That is the least common multiple of the period and the frame interval:
+    the smallest whole number of periods, up to ``max_periods``, that spans
+    a whole number of frames (to within ``rtol``). At 30 fps a 5 s period
+    repeats after 150 frames (one period) and a 2.45 s period after 147
+    (two periods).
+    """
+    frames = fps * 2 * np.pi / abs(omega)
+    for periods in range(1, max_periods + 1):
+        total = periods * frames
+        whole = round(total)
+        if whole >= 1 and abs(total - whole) <= rtol * total:
+            return whole
+    return None
+
+
+def sample_peaks(samples):
+    """Return the largest magnitudes of d, v and a in sampled :class:`Kinematics`."""
+    return tuple(float(np.abs(field).max(initial=0.0))
+                 for field in (samples.d, samples.v, samples.a))
+
+
+class SampledKinematics:
+    """Kinematics of every frame, stored as precomputed arrays.
+
+    Frames are the samples of :func:`kinematics`; :meth:`at` and
+    :meth:`window` index and slice them without copying. The times are
+    not stored: ``samples.t`` is a :class:`TimeBase`.
+    """
+
+    def __init__(self, R, omega, t_max, fps):
+        self.R = R
+        self.omega = omega
+        self.fps = fps
+        samples = kinematics(R, omega, t_max, fps)
+        self.samples = samples._replace(t=TimeBase(fps, len(samples.t)))
+
+    def peaks(self):
+        """Return the largest magnitudes of d, v and a over the motion."""
+        return abs(self.R), abs(self.R * self.omega), abs(self.R) * self.omega**2
+
+    def at(self, frame):
+        """Return the :class:`Kinematics` of one frame, as scalars."""
+        return Kinematics(*(field[frame] for field in self.samples))
+
+    def window(self, start, stop):
+        """Return the :class:`Kinematics` of frames ``start`` to ``stop - 1``."""
+        return Kinematics(*(field[start:stop] for field in self.samples))
+
+    def orbit(self):
+        """Return the x, y and z arrays of the path traced by the particle."""
+        return self.samples.x, self.samples.y, self.samples.z
+
+
+class ClosedFormKinematics:
+    """Kinematics evaluated in closed form for each request, storing nothing.
+
+    Frame ``k`` is at time ``k / fps`` (an unbounded :class:`TimeBase`), so
+    memory stays constant however long an animation runs.
+    """
+
+    def __init__(self, R, omega, fps):
+        self.R = R
+        self.omega = omega
+        self.fps = fps
+        self.time = TimeBase(fps)
+
+    def peaks(self):
+        """Return the largest magnitudes of d, v and a over the motion."""
+        return abs(self.R), abs(self.R * self.omega), abs(self.R) * self.omega**2
+
+    def at(self, frame):
+        """Return the :class:`Kinematics` of one frame, as scalars."""
+        return circular_motion(self.R, self.omega, self.time[frame])
+
+    def window(self, start, stop):
+        """Return the :class:`Kinematics` of frames ``start`` to ``stop - 1``."""
+        return circular_motion(self.R, self.omega, self.time[start:stop])
+
+    def orbit(self):
+        """Return the x, y and z arrays of the path traced by the particle."""
+        n = max(int(np.ceil(self.fps * 2 * np.pi / abs(self.omega))), 2)
+        path = self.window(0, n + 1)
+        return path.x, path.y, path.z
+
+
+class PeriodicKinematics(ClosedFormKinematics):
+    """Kinematics served from one stored period of frame-aligned samples.
+
+    Frame ``k`` is at time ``k / fps``. When a period spans a whole number
+    of frames (see :func:`frames_per_period`), only that many samples are
+    stored and frame ``k`` is served from sample ``k % frames_per_period``,
+    so memory is O(frames per period) however long the animation runs.
+    Otherwise nothing is stored and frames are evaluated in closed form on
+    demand, as by :class:`ClosedFormKinematics`.
+    """
+
+    def __init__(self, R, omega, fps):
+        super().__init__(R, omega, fps)
+        self.frames_per_period = frames_per_period(omega, fps)
+        if self.frames_per_period is None:
+            self.cycle = None
+        else:
+            self.cycle = circular_motion(R, omega, self.time[:self.frames_per_period])
+
+    def at(self, frame):
+        """Return the :class:`Kinematics` of one frame, as scalars."""
+        if self.cycle is None:
+            return super().at(frame)
+        index = frame % self.frames_per_period
+        return Kinematics(self.time[frame], *(field[index] for field in self.cycle[1:]))
+
+    def window(self, start, stop):
+        """Return the :class:`Kinematics` of frames ``start`` to ``stop - 1``."""
+        if self.cycle is None:
+            return super().window(start, stop)
+        index = np.arange(start, stop) % self.frames_per_period
+        return Kinematics(self.time[start:stop], *(field[index] for field in self.cycle[1:]))
+
+    def orbit(self):
+        """Return the x, y and z arrays of the path traced by the particle."""
+        if self.cycle is None:
+            return super().orbit()
+        # Close the loop by repeating the first sample.
+        path = self.window(0, self.frames_per_period + 1)
+        return path.x, path.y, path.z
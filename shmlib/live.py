@@ -0,0 +1,79 @@
+"""Wall-clock frame timing for endless real-time animations.
+
+A :class:`FrameClock` turns elapsed time into frame indices: frame ``k`` is
+due ``k / fps`` seconds after the clock started. When drawing falls behind,
+the next frame is simply the one due now and the frames in between are
+dropped, so the animation never lags behind real time however long it
+runs.
+"""
+
+import time
+
+
+class FrameClock:
+    """Frame indices due at the current wall-clock time.
+
+    Iterating yields the frame due at each step, e.g. as the ``frames`` of
+    a ``FuncAnimation``. Each frame is counted once in :attr:`drawn`, an
+    early step repeats the current frame, and frames skipped because a
+    step came late are counted in :attr:`dropped`.
+
+    Parameters
+    ----------
+    fps : float
+        Target frames per second.
+    clock : callable
+        Returns the current time in seconds; ``time.perf_counter`` by
+        default.
+    rate_interval : float
+        Seconds over which :attr:`recent_fps` is measured.
+    """
+
+    def __init__(self, fps, clock=time.perf_counter, rate_interval=1.0):
+        self.fps = fps
+        self.clock = clock
+        self.rate_interval = rate_interval
+        self.start = None
+        self.frame = None
+        self.drawn = 0
+        self.dropped = 0
+        self.recent_fps = 0.0
+        self._mark = None  # (time, drawn) where the current rate interval began
+
+    def __iter__(self):
+        while True:
+            yield self.next_frame()
+
+    def next_frame(self):
+        """Return the frame due now and update the counters."""
+        now = self.clock()
+        if self.start is None:
+            self.start = now
+            self._mark = (now, 0)
+        frame = int((now - self.start) * self.fps)
+        if self.frame is not None:
+            if frame <= self.frame:
+                return self.frame  # an early tick: this frame is already shown
+            self.dropped += frame - self.frame - 1
+        self.frame = frame
+        self.drawn += 1
+
+        mark_time, mark_drawn = self._mark
+        if now - mark_time >= self.rate_interval:
+            self.recent_fps = (self.drawn - mark_drawn) / (now - mark_time)
+            self._mark = (now, self.drawn)
+        return frame
+
+    def elapsed(self):
+        """Return the seconds since the first frame."""
+        return 0.0 if self.start is None else self.clock() - self.start
+
+    def achieved_fps(self):
+        """Return the mean frames drawn per second since the first frame."""
+        elapsed = self.elapsed()
+        return self.drawn / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Return a one-line report of achieved versus target frame rate."""
+        return (f"{self.recent_fps:.1f} fps (target {self.fps:g}, "
+                f"mean {self.achieved_fps():.1f}), {self.dropped} frames dropped")
@@ -0,0 +1,368 @@
+"""Encoding the animation to video files.
+
+:func:`render_video` draws a single :class:`~shmlib.scene.Scene` frame by
+frame and streams the canvas buffers into an ffmpeg pipe, so memory stays
+flat however many frames are rendered. :func:`render_video_parallel`
+instead splits the frame range across worker processes: every frame depends
+only on its index and the precomputed arrays, so each worker draws its own
+copy of the figure to raw RGB buffers and the parent feeds them, in order,
+to one ffmpeg process.
+
+Both draw through a :class:`FrameCompositor` by default: the static parts
+of the figure are rasterised once, and because the 3D panel repeats every
+period its moving artists are rasterised once per period and pasted into
+later frames, leaving only the time-series lines to draw per frame.
+"""
+
+import multiprocessing
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from shmlib.kinematics import loop_length
+from shmlib.scene import Scene
+
+CHUNK_FRAMES = 4  # frames per task in render_video_parallel
+
+
+def render_video(R, omega, t_max, fps, figsize, dpi, codec, suffix, queue_size=4,
+                 composite=True, window=None, frames=None):
+    """Render the animation in this process and return the video as bytes.
+
+    ``codec`` is the ffmpeg video codec and ``suffix`` the file extension
+    that selects the container, e.g. ``("h264", ".mp4")``. With
+    ``composite`` the frames are drawn by a :class:`FrameCompositor`,
+    otherwise every frame is a full figure draw. ``window`` is passed to
+    the :class:`~shmlib.scene.Scene`, and ``frames`` selects the frames to
+    encode (all ``n_frames`` by default); see :func:`loop_frames`.
+    """
+    with Scene(R, omega, t_max, fps, figsize, dpi, blit=composite, periodic=composite,
+               window=window, offscreen=True) as scene, \
+            tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "animation" + suffix)
+        export_video(scene, path, codec, queue_size=queue_size, composite=composite,
+                     frames=frames)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def export_video(scene, path, codec, queue_size=4, composite=False, frames=None):
+    """Encode the ``frames`` of ``scene`` (all by default) into the file at ``path``."""
+    width, height = scene.fig.canvas.get_width_height(physical=True)
+    if composite:
+        images = iter_frames_composited(scene, frames)
+    else:
+        images = iter_frames(scene, frames)
+    stream_video(images, path, width, height, scene.fps, codec, queue_size=queue_size)
+
+
+def loop_frames(omega, fps, window):
+    """Return the frames of one seamless loop of a scene scrolling ``window`` seconds.
+
+    The loop is :func:`~shmlib.kinematics.loop_length` frames long, the
+    least common period of the 3D panel and the scrolling time-series
+    panels, so playing it on repeat shows no seam and no repeated frame.
+    It starts at the first whole loop after the scrolling window has
+    filled up, so the panels look the same at its end and its start.
+    """
+    length = loop_length(omega, fps)
+    if length is None:
+        raise ValueError(f"the motion does not repeat after a whole number of frames "
+                         f"at {fps} fps")
+    start = -(-int(np.ceil(window * fps)) // length) * length
+    return range(start, start + length)
+
+
+def iter_frames(scene, frames=None):
+    """Yield the frames of ``scene`` as zero-copy views of its RGBA canvas.
+
+    Each view aliases the Agg renderer's buffer, so it is only valid until
+    the generator is advanced and the next frame is drawn.
+    """
+    canvas = scene.fig.canvas
+    for frame in range(scene.n_frames) if frames is None else frames:
+        scene.update(frame)
+        canvas.draw()
+        yield canvas.buffer_rgba()
+
+
+def iter_frames_composited(scene, frames=None):
+    """Like :func:`iter_frames`, but drawing through a :class:`FrameCompositor`."""
+    compositor = FrameCompositor(scene)
+    for frame in range(scene.n_frames) if frames is None else frames:
+        yield compositor.render(frame)
+
+
+class FrameCompositor:
+    """Draws frames of a scene from cached layers instead of from scratch.
+
+    Everything but the artists returned by ``Scene.update`` is drawn once
+    into a background. With frame-aligned periodic kinematics (a scene
+    built with ``periodic=True`` whose period is a whole number of frames)
+    the 3D panel looks the same in frames ``k`` and ``k + frames_per_period``,
+    so the pixels its moving artists change are captured the first time
+    each phase is drawn and pasted back for every later period. Only the
+    four time-series lines are drawn every frame.
+
+    The scene must be built with ``blit=True``; its dynamic artists are
+    marked animated, so it should not also be drawn with ``canvas.draw()``.
+    Pass ``dedupe=False`` to draw the 3D artists every frame.
+    """
+
+    def __init__(self, scene, dedupe=True):
+        if not scene.blit:
+            raise ValueError("FrameCompositor needs a Scene built with blit=True")
+        self.scene = scene
+        self.canvas = scene.fig.canvas
+        artists = scene.update(0)
+        self.artists_3d, self.artists_2d = artists[:4], artists[4:]
+        for artist in artists:
+            artist.set_animated(True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(scene.fig.bbox)
+        self._background_pixels = _as_uint32(np.asarray(self.canvas.buffer_rgba())).copy()
+        self.frames_per_period = (getattr(scene.motion, "frames_per_period", None)
+                                  if dedupe else None)
+        self.layers = {}  # phase -> (rows, cols, pixels) of the 3D artists
+        self.hits = 0
+
+    def render(self, frame):
+        """Draw ``frame`` and return a zero-copy view of the RGBA canvas."""
+        self.scene.update(frame)
+        self.canvas.restore_region(self.background)
+        pixels = np.asarray(self.canvas.buffer_rgba())
+
+        phase = None if self.frames_per_period is None else frame % self.frames_per_period
+        layer = self.layers.get(phase)
+        if layer is None:
+            for artist in self.artists_3d:
+                self.scene.ax3d.draw_artist(artist)
+            if phase is not None:
+                self.layers[phase] = self._capture(pixels)
+        else:
+            rows, cols, patch = layer
+            pixels[rows, cols] = patch
+            self.hits += 1
+
+        for artist in self.artists_2d:
+            artist.axes.draw_artist(artist)
+        return self.canvas.buffer_rgba()
+
+    def cached_bytes(self):
+        """Return the memory held by the cached 3D layers."""
+        return sum(patch.nbytes for _, _, patch in self.layers.values())
+
+    def _capture(self, pixels):
+        # Keep only the bounding box of the pixels the 3D artists changed,
+        # which is far smaller than the panel; outside it the frame equals
+        # the background, so pasting the box back is exact.
+        changed = _as_uint32(pixels) != self._background_pixels
+        rows = np.flatnonzero(changed.any(axis=1))
+        cols = np.flatnonzero(changed.any(axis=0))
+        if not len(rows):
+            return slice(0, 0), slice(0, 0), pixels[:0, :0].copy()
+        rows = slice(rows[0], rows[-1] + 1)
+        cols = slice(cols[0], cols[-1] + 1)
+        return rows, cols, pixels[rows, cols].copy()
+
+
+def _as_uint32(pixels):
+    # One uint32 per RGBA pixel, so pixels are compared in a single pass.
+    return pixels.view(np.uint32)[..., 0]
+
+
+def stream_video(frames, path, width, height, fps, codec, queue_size=4):
+    """Encode an iterable of RGBA frame buffers through an ffmpeg pipe.
+
+    With ``queue_size`` 0 every buffer is written straight to ffmpeg's stdin
+    without a copy, and rendering waits for the encoder. Otherwise frames
+    are copied into ``queue_size`` preallocated slots that a writer thread
+    drains, so rendering overlaps with encoding; once all slots are waiting
+    the producer blocks until ffmpeg catches up. Either way memory use does
+    not depend on the number of frames.
+    """
+    encoder = subprocess.Popen(
+        ffmpeg_rawvideo_command(path, width, height, fps, codec, pix_fmt="rgba"),
+        stdin=subprocess.PIPE)
+    try:
+        if queue_size:
+            _write_queued(frames, encoder.stdin, (height, width, 4), queue_size)
+        else:
+            for frame in frames:
+                encoder.stdin.write(frame)
+    except BaseException:
+        encoder.kill()
+        encoder.wait()
+        raise
+    encoder.stdin.close()
+    if encoder.wait():
+        raise RuntimeError(f"ffmpeg exited with status {encoder.returncode}")
+
+
+def _write_queued(frames, stream, shape, queue_size):
+    free = queue.Queue()
+    filled = queue.Queue()
+    for _ in range(queue_size):
+        free.put(np.empty(shape, dtype=np.uint8))
+    errors = []
+
+    def write():
+        while (slot := filled.get()) is not None:
+            if not errors:
+                try:
+                    stream.write(slot)
+                except Exception as exc:  # keep draining so the producer never blocks
+                    errors.append(exc)
+            free.put(slot)
+
+    writer = threading.Thread(target=write, name="ffmpeg-writer", daemon=True)
+    writer.start()
+    try:
+        for frame in frames:
+            slot = free.get()
+            np.copyto(slot, frame)
+            filled.put(slot)
+            if errors:
+                break
+    finally:
+        filled.put(None)
+        writer.join()
+    if errors:
+        raise errors[0]
+
+
+def ffmpeg_rawvideo_command(path, width, height, fps, codec, pix_fmt="rgb24"):
+    """Return the ffmpeg command line encoding raw ``pix_fmt`` frames from stdin."""
+    import matplotlib
+
+    command = [matplotlib.rcParams["animation.ffmpeg_path"],
+               "-loglevel", "error",
+               "-f", "rawvideo", "-pix_fmt", pix_fmt,
+               "-s", f"{width}x{height}", "-framerate", str(fps),
+               "-i", "pipe:",
+               "-vcodec", codec,
+               # Most browsers only decode 4:2:0 H.264 and VP9, whatever the
+               # input format, and 4:2:0 needs an even width and height, so
+               # an odd canvas gets one blank row or column.
+               "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p"]
+    return command + ["-y", path]
+
+
+# ---------------------------
+# WORKER PROCESSES
+# ---------------------------
+_worker_scene = None  # the Scene each worker process draws its frames on
+_worker_compositor = None  # and its FrameCompositor, when compositing
+
+
+def _worker_context():
+    # Streamlit executes the page as ``__main__``, and spawned or forkserver
+    # children re-import ``__main__`` before running any task, which would
+    # re-run the whole page in every worker. Forked children skip that, but
+    # forking a multi-threaded process can deadlock a child on a lock another
+    # thread held at the fork, which is why the Streamlit page renders
+    # serially unless SHM_RENDER_WORKERS asks for workers.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def _init_worker(scene_args, composite, window):
+    global _worker_scene, _worker_compositor
+    _worker_scene = Scene(*scene_args, blit=composite, periodic=composite, window=window,
+                          offscreen=True)
+    if composite:
+        _worker_compositor = FrameCompositor(_worker_scene)
+
+
+def _canvas_size(figsize, dpi):
+    # Pixel size of the Agg canvas of an offscreen Scene with these settings.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    return FigureCanvasAgg(Figure(figsize=figsize, dpi=dpi)).get_width_height(physical=True)
+
+
+def _render_chunk(frames):
+    started = time.perf_counter()
+    if _worker_compositor is None:
+        images = [_worker_scene.render_rgb(frame) for frame in frames]
+    else:
+        images = [np.asarray(_worker_compositor.render(frame))[..., :3].tobytes()
+                  for frame in frames]
+    return os.getpid(), images, time.perf_counter() - started
+
+
+def render_video_parallel(R, omega, t_max, fps, figsize, dpi, codec, suffix,
+                          workers=None, chunk_size=None, composite=True, window=None,
+                          frames=None):
+    """Render frames in ``workers`` processes and return ``(video, stats)``.
+
+    The frames are cut into chunks of ``chunk_size`` successive frames
+    (:data:`CHUNK_FRAMES` by default). At most two chunks per worker are in
+    flight at a time, so the parent holds at most ``2 * workers *
+    chunk_size`` frames however long the video is. ``stats`` holds one dict
+    per worker process with the frames it rendered, the seconds it spent
+    and its frames per second. ``composite``, ``window`` and ``frames`` are
+    as for :func:`render_video`; each worker keeps its own
+    :class:`FrameCompositor`.
+    """
+    workers = workers or os.cpu_count() or 1
+    scene_args = (R, omega, t_max, fps, figsize, dpi)
+    if frames is None:
+        frames = range(int(t_max * fps))
+    elif not isinstance(frames, range):
+        frames = list(frames)
+    chunk_size = chunk_size or CHUNK_FRAMES
+    # Slices of a range are ranges, so a chunk is sent as three integers.
+    chunks = deque(frames[start:start + chunk_size]
+                   for start in range(0, len(frames), chunk_size))
+
+    # Agg truncates figsize * dpi to whole pixels; frames are checked against
+    # the size of an identical canvas.
+    width, height = _canvas_size(figsize, dpi)
+    frame_bytes = width * height * 3
+
+    stats = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "animation" + suffix)
+        encoder = subprocess.Popen(
+            ffmpeg_rawvideo_command(path, width, height, fps, codec),
+            stdin=subprocess.PIPE)
+        try:
+            with ProcessPoolExecutor(workers, mp_context=_worker_context(),
+                                     initializer=_init_worker,
+                                     initargs=(scene_args, composite, window)) as pool:
+                in_flight = deque()
+                while chunks or in_flight:
+                    while chunks and len(in_flight) < 2 * workers:
+                        in_flight.append(pool.submit(_render_chunk, chunks.popleft()))
+                    pid, images, seconds = in_flight.popleft().result()
+                    for image in images:
+                        if len(image) != frame_bytes:
+                            raise RuntimeError(f"worker {pid} rendered a {len(image)}-byte "
+                                               f"frame, expected {width}x{height} RGB")
+                        encoder.stdin.write(image)
+                    worker = stats.setdefault(pid, {"pid": pid, "frames": 0, "seconds": 0.0})
+                    worker["frames"] += len(images)
+                    worker["seconds"] += seconds
+        except BaseException:
+            encoder.kill()
+            encoder.wait()
+            raise
+        encoder.stdin.close()
+        if encoder.wait():
+            raise RuntimeError(f"ffmpeg exited with status {encoder.returncode}")
+        with open(path, "rb") as f:
+            video = f.read()
+
+    for worker in stats.values():
+        worker["fps"] = worker["frames"] / worker["seconds"] if worker["seconds"] else 0.0
+    return video, sorted(stats.values(), key=lambda worker: worker["pid"])
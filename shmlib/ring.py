@@ -0,0 +1,57 @@
+"""Fixed-size history of the most recent samples of several series.
+
+Used by the scrolling time-series panels, where each frame adds one sample
+and the line shows only the last few seconds: appending is O(1) and the
+current window is always available as one contiguous array, so the cost of
+a frame does not grow with how long the animation has been running.
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    """The last ``capacity`` samples of ``n_series`` series.
+
+    Every sample is stored twice, ``capacity`` columns apart, so the most
+    recent samples in order are always a contiguous slice of the storage and
+    :meth:`view` never copies or wraps around.
+    """
+
+    def __init__(self, capacity, n_series, dtype=float):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self.size = 0
+        self._next = 0  # column of the next sample, in [0, capacity)
+        self._data = np.zeros((n_series, 2 * capacity), dtype=dtype)
+
+    def __len__(self):
+        return self.size
+
+    def append(self, values):
+        """Add one sample: a value for each series."""
+        i = self._next
+        self._data[:, i] = values
+        self._data[:, i + self.capacity] = values
+        self._next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, values):
+        """Add the samples in the columns of an ``(n_series, k)`` array."""
+        values = np.asarray(values)[:, -self.capacity:]
+        k = values.shape[1]
+        columns = (self._next + np.arange(k)) % self.capacity
+        self._data[:, columns] = values
+        self._data[:, columns + self.capacity] = values
+        self._next = (self._next + k) % self.capacity
+        self.size = min(self.size + k, self.capacity)
+
+    def clear(self):
+        """Forget every sample."""
+        self.size = 0
+        self._next = 0
+
+    def view(self):
+        """Return the stored samples, oldest first, as an ``(n_series, size)`` view."""
+        end = self._next + self.capacity
+        return self._data[:, end - self.size:end]
@@ -0,0 +1,358 @@
+"""The circular motion / SHM figure and its per-frame update.
+
+A :class:`Scene` owns one figure: the 3D panel with the particle, radius,
+projection line and force arrow, and the four time-series panels. Building
+it in one place lets the same figure be driven by ``FuncAnimation`` in an
+interactive window or rasterised frame by frame for video. matplotlib is
+only imported once a Scene is built, and an offscreen scene never imports
+pyplot or selects a backend.
+"""
+
+import numpy as np
+
+from shmlib.damped import DampedDrivenKinematics
+from shmlib.decimate import MinMaxPyramid, minmax_decimate
+from shmlib.integrators import IntegratedKinematics
+from shmlib.kinematics import ClosedFormKinematics, PeriodicKinematics, SampledKinematics
+from shmlib.ring import RingBuffer
+
+ARROW_HEAD_COS = np.cos(np.radians(15))  # Axes3D.quiver draws its heads
+ARROW_HEAD_SIN = np.sin(np.radians(15))  # at +/-15 degrees to the shaft
+
+
+def set_arrow_segments(segments, x, y, z, u, v, w, arrow_length_ratio=0.2):
+    """Write the shaft and two head lines of a 3D arrow into ``segments``.
+
+    ``segments`` is a preallocated (3, 2, 3) array: the shaft followed by the
+    two head lines, each running from the tip. The geometry matches a single
+    tail-pivoted arrow from ``Axes3D.quiver``, so one Line3DCollection can be
+    updated in place instead of drawing a new quiver every frame.
+    """
+    tip_x, tip_y, tip_z = x + u, y + v, z + w
+    segments[:, 0] = (tip_x, tip_y, tip_z)
+    segments[0, 1] = (x, y, z)
+
+    # The head lines are the arrow rotated by +/-15 degrees about the axis
+    # (nx, ny, 0), which lies in the xy-plane perpendicular to the arrow.
+    norm_xy = np.hypot(u, v)
+    if norm_xy:
+        nx, ny = v / norm_xy, -u / norm_xy
+    else:
+        nx, ny = 0.0, 1.0
+    cx, cy, cz = ny * w, -nx * w, nx * v - ny * u  # n x (u, v, w)
+    c = ARROW_HEAD_COS * arrow_length_ratio
+    s = ARROW_HEAD_SIN * arrow_length_ratio
+    segments[1, 1] = (tip_x - c * u - s * cx, tip_y - c * v - s * cy, tip_z - c * w - s * cz)
+    segments[2, 1] = (tip_x - c * u + s * cx, tip_y - c * v + s * cy, tip_z - c * w + s * cz)
+    return segments
+
+
+class Scene:
+    """The animation figure for one set of parameters.
+
+    Parameters
+    ----------
+    R : float
+        Radius of the circular motion [m].
+    omega : float
+        Angular velocity [rad/s].
+    t_max : float
+        Duration of the animation [s].
+    fps : float
+        Frames per second.
+    figsize : tuple of float
+        Figure size [inches].
+    dpi : float
+        Figure resolution [dots per inch].
+    blit : bool
+        Whether the scene is animated with blitting, in which case
+        :meth:`update` also projects the 3D force arrow itself.
+    periodic : bool
+        Serve frames from one stored period of the motion
+        (:class:`~shmlib.kinematics.PeriodicKinematics`) instead of
+        precomputing every frame, for long-running loops.
+    window : float or None
+        Show only the last ``window`` seconds in the time-series panels, as
+        a scrolling oscilloscope trace, instead of the whole run from 0 to
+        ``t_max``. The recent samples are kept in a :class:`RingBuffer`, so
+        a frame costs the same however long the animation has run, and
+        frames past ``n_frames`` are valid (the motion is then always
+        periodic).
+    live : bool
+        Evaluate every frame in closed form on demand
+        (:class:`~shmlib.kinematics.ClosedFormKinematics`), storing no
+        samples at all; used with ``window`` for endless real-time runs.
+    decimate : bool
+        Hand the time-series lines at most a few points per pixel column,
+        keeping every peak, so drawing them costs the same however many
+        samples they span. With precomputed samples the decimation is
+        answered by a :class:`~shmlib.decimate.MinMaxPyramid` per series,
+        built once, and otherwise by
+        :func:`~shmlib.decimate.minmax_decimate` on every frame.
+    offscreen : bool
+        Build a plain ``Figure`` on its own Agg canvas instead of a pyplot
+        figure. Nothing outside the scene then refers to the figure, no GUI
+        toolkit is probed, and :meth:`close` releases it; use this for
+        rendering on servers.
+
+    zeta, drive_amplitude, drive_omega : float
+        Damping ratio, driving force per unit mass [m/s²] and driving
+        angular frequency [rad/s] (``omega`` if None). With damping or a
+        drive the frames come from
+        :class:`~shmlib.damped.DampedDrivenKinematics`, which needs
+        precomputed samples, so ``periodic``, ``window`` and ``live`` must
+        be left off.
+    model : Pendulum or Duffing or None
+        A nonlinear oscillator from :mod:`shmlib.integrators`, released from
+        rest at ``x = R`` and integrated with the symplectic ``integrator``
+        (:class:`~shmlib.integrators.IntegratedKinematics`) instead of the
+        linear motion, and its ``omega`` replaces the ``omega`` argument,
+        so the phase-space panel and the force arrow are scaled to match
+        its samples. Like damping, it needs precomputed samples.
+    integrator : str
+        ``"verlet"``, ``"leapfrog"`` or ``"yoshida4"``, or ``"dopri5"`` for
+        adaptive steps decoupled from the frames.
+
+    A scene is also a context manager that closes it on exit.
+    """
+
+    def __init__(self, R, omega, t_max, fps, figsize=(12, 10), dpi=100, blit=False,
+                 periodic=False, window=None, live=False, decimate=True, offscreen=False,
+                 zeta=0.0, drive_amplitude=0.0, drive_omega=None, model=None,
+                 integrator="yoshida4"):
+        self.R = R
+        self.omega = omega
+        self.t_max = t_max
+        self.fps = fps
+        self.blit = blit
+        self.window = window
+        self.decimate = decimate
+        self.offscreen = offscreen
+        self.n_frames = int(t_max * fps)
+        if zeta or drive_amplitude or model is not None:
+            if periodic or window is not None or live:
+                raise ValueError("a damped, driven or nonlinear scene cannot be periodic, "
+                                 "windowed or live")
+        if model is not None:
+            if zeta or drive_amplitude:
+                raise ValueError("a nonlinear scene cannot be damped or driven")
+            self.motion = IntegratedKinematics(model, R, t_max, fps, integrator)
+            self.omega = self.motion.omega
+        elif zeta or drive_amplitude:
+            self.motion = DampedDrivenKinematics(R, omega, t_max, fps, zeta,
+                                                 drive_amplitude, drive_omega)
+        elif live:
+            self.motion = ClosedFormKinematics(R, omega, fps)
+        elif periodic or window is not None:
+            self.motion = PeriodicKinematics(R, omega, fps)
+        else:
+            self.motion = SampledKinematics(R, omega, t_max, fps)
+        if window is None:
+            self.history = None
+        else:
+            # t, F, d, v and a of the frames inside the window.
+            self.history = RingBuffer(int(round(window * fps)) + 1, 5)
+            self._last_frame = None
+        if decimate and isinstance(self.motion, SampledKinematics):
+            # One pyramid each for F, d, v and a; F and a share their array.
+            samples = self.motion.samples
+            pyramids = {}
+            for y in (samples.F, samples.d, samples.v, samples.a):
+                if id(y) not in pyramids:
+                    pyramids[id(y)] = MinMaxPyramid(y)
+            self.pyramids = tuple(pyramids[id(y)]
+                                  for y in (samples.F, samples.d, samples.v, samples.a))
+        else:
+            self.pyramids = None
+
+        self._setup_figure(figsize, dpi)
+        self._setup_artists()
+
+    def _setup_figure(self, figsize, dpi):
+        from matplotlib.gridspec import GridSpec
+
+        t_max = self.t_max
+        d_peak, v_peak, a_peak = self.motion.peaks()
+        phase_space = isinstance(self.motion, (DampedDrivenKinematics, IntegratedKinematics))
+
+        if self.offscreen:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            fig = self.fig = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(fig)
+        else:
+            import matplotlib.pyplot as plt
+
+            fig = self.fig = plt.figure(figsize=figsize, dpi=dpi)
+        fig.suptitle("Circular Motion, SHM Projections, and Real-Time Force", fontsize=16)
+
+        grid = GridSpec(4, 4, figure=fig, wspace=0.5, hspace=0.6)
+        # Scrolling panels show time relative to the current frame.
+        time_lim = (0, t_max) if self.window is None else (-self.window, 0)
+
+        # 3D animation panel (left two columns)
+        ax3d = self.ax3d = fig.add_subplot(grid[:, :2], projection='3d')
+        # The particle is at (d, -v / omega), the reference circle of SHM.
+        ax3d.set_title("3D Phase-Space Motion" if phase_space else "3D Circular Motion")
+        lim = max(d_peak, v_peak / abs(self.omega)) * 1.2
+        ax3d.set_xlim([-lim, lim])
+        ax3d.set_ylim([-lim, lim])
+        ax3d.set_zlim([-lim, lim])
+        ax3d.set_xlabel("X")
+        ax3d.set_ylabel("Y")
+        ax3d.set_zlabel("Z")
+        ax3d.view_init(elev=20, azim=45)
+
+        # Time-series plots on the right
+        ax_f = self.ax_f = fig.add_subplot(grid[0, 2:])
+        ax_f.set_title("Force vs Time")
+        ax_f.set_xlim(*time_lim)
+        force_lim = a_peak * 1.2
+        ax_f.set_ylim(-force_lim, force_lim)
+        ax_f.set_ylabel("F (N)")
+
+        ax_d = self.ax_d = fig.add_subplot(grid[1, 2:])
+        ax_d.set_title("Displacement vs Time")
+        ax_d.set_xlim(*time_lim)
+        ax_d.set_ylim(-d_peak * 1.2, d_peak * 1.2)
+        ax_d.set_ylabel("d (m)")
+
+        ax_v = self.ax_v = fig.add_subplot(grid[2, 2:])
+        ax_v.set_title("Velocity vs Time")
+        ax_v.set_xlim(*time_lim)
+        vel_lim = v_peak * 1.2
+        ax_v.set_ylim(-vel_lim, vel_lim)
+        ax_v.set_ylabel("v (m/s)")
+
+        ax_a = self.ax_a = fig.add_subplot(grid[3, 2:])
+        ax_a.set_title("Acceleration vs Time")
+        ax_a.set_xlim(*time_lim)
+        ax_a.set_ylim(-force_lim, force_lim)
+        ax_a.set_ylabel("a (m/s²)")
+        ax_a.set_xlabel("Time (s)" if self.window is None else "Time relative to now (s)")
+
+    def _setup_artists(self):
+        ax3d = self.ax3d
+        ax3d.plot(*self.motion.orbit(), "gray", lw=0.5, alpha=0.5)
+
+        self.point_3d, = ax3d.plot([], [], [], "ro", markersize=8, label="Particle")
+        self.line_center_to_point, = ax3d.plot([], [], [], "r:", lw=2, label="Radius")
+        self.proj_line, = ax3d.plot([], [], [], "g--", lw=1, label="Projection (SHM)")
+        self.force_segments = np.zeros((3, 2, 3))  # shaft + two head lines
+        self.force_quiver = ax3d.quiver([], [], [], [], [], [], color='orange')
+
+        self.line_f, = self.ax_f.plot([], [], "orange", lw=2, label="F(t)")
+        self.line_d, = self.ax_d.plot([], [], "r-", lw=2, label="d(t)")
+        self.line_v, = self.ax_v.plot([], [], "m-", lw=2, label="v(t)")
+        self.line_a, = self.ax_a.plot([], [], "c-", lw=2, label="a(t)")
+
+    def update(self, frame):
+        """Move the dynamic artists to ``frame`` and return them."""
+        omega = self.omega
+        state = self.motion.at(frame)
+        x, y, z = state[1:4]
+
+        self.point_3d.set_data([x], [y])
+        self.point_3d.set_3d_properties([z])
+
+        self.line_center_to_point.set_data([0, x], [0, y])
+        self.line_center_to_point.set_3d_properties([0, z])
+
+        self.proj_line.set_data([x, x], [0, 0])
+        self.proj_line.set_3d_properties([0, z])
+
+        # Update force vector in place. Its x-component is the force on the
+        # projection; for circular motion the arrow is the centripetal force
+        # -omega^2 times the position, so it repeats exactly with the position.
+        fx = state.F
+        fy = -omega**2 * y
+        fz = 0
+        set_arrow_segments(self.force_segments, x, y, z, fx, fy, fz, arrow_length_ratio=0.2)
+        self.force_quiver.set_segments(self.force_segments)
+        if self.blit and self.ax3d.M is not None:
+            # 3D collections are only projected during a full figure draw, so
+            # project the arrow here for FuncAnimation's draw_artist().
+            self.force_quiver.do_3d_projection()
+
+        self._update_traces(frame, state)
+        return (self.point_3d, self.line_center_to_point, self.proj_line, self.force_quiver,
+                self.line_f, self.line_d, self.line_v, self.line_a)
+
+    def _update_traces(self, frame, state):
+        lines = (self.line_f, self.line_d, self.line_v, self.line_a)
+        if self.pyramids is not None:
+            t = self.motion.samples.t
+            columns = self._trace_columns(t[0], t[frame])
+            for line, pyramid in zip(lines, self.pyramids):
+                index = pyramid.prefix(frame + 1, columns)
+                line.set_data(t[index], pyramid.y[index])
+            return
+
+        if self.history is None:
+            history = self.motion.window(0, frame + 1)
+            t, series = history.t, (history.F, history.d, history.v, history.a)
+        else:
+            t, *series = self._scroll(frame, state)
+            t = t - state.t
+        if self.decimate:
+            columns = self._trace_columns(t[0], t[-1])
+            for line, y in zip(lines, series):
+                line.set_data(*minmax_decimate(t, y, columns))
+        else:
+            for line, y in zip(lines, series):
+                line.set_data(t, y)
+
+    def _trace_columns(self, t_start, t_stop):
+        # Pixel columns spanned by [t_start, t_stop]; the four panels share
+        # their width and time axis.
+        t_lo, t_hi = self.ax_f.get_xlim()
+        return int(np.ceil(self.ax_f.bbox.width * (t_stop - t_start) / (t_hi - t_lo)))
+
+    def _scroll(self, frame, state):
+        # Consecutive frames append one sample and a short skip forward (a
+        # dropped frame) appends the few missed ones; any other jump (the
+        # first frame, a restart or a seek) refills the window instead.
+        last = self._last_frame
+        if last is not None and frame == last + 1:
+            self.history.append((state.t, state.F, state.d, state.v, state.a))
+        elif last is not None and last + 1 < frame < last + self.history.capacity:
+            missed = self.motion.window(last + 1, frame + 1)
+            self.history.extend((missed.t, missed.F, missed.d, missed.v, missed.a))
+        elif frame != last:
+            past = self.motion.window(max(0, frame - self.history.capacity + 1), frame + 1)
+            self.history.clear()
+            self.history.extend((past.t, past.F, past.d, past.v, past.a))
+        self._last_frame = frame
+        return self.history.view()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the figure; the scene cannot be drawn afterwards.
+
+        A pyplot figure is also removed from pyplot's list of open figures.
+        The axes and artists are removed from the figure and the canvas'
+        pixel buffer is freed right away; the figure itself refers to its
+        canvas and back, so what little remains waits for the garbage
+        collector.
+        """
+        if not self.offscreen:
+            import matplotlib.pyplot as plt
+
+            plt.close(self.fig)
+        self.fig.clear()
+        if hasattr(self.fig.canvas, "renderer"):
+            del self.fig.canvas.renderer
+
+    def render_rgb(self, frame):
+        """Draw ``frame`` on the figure's canvas and return it as RGB bytes."""
+        self.update(frame)
+        canvas = self.fig.canvas
+        canvas.draw()
+        return np.asarray(canvas.buffer_rgba())[..., :3].tobytes()
+